@@ -7,46 +7,32 @@
 # Date      : 27-Nov-2023
 # Version:  : 
 # ----------------------------------------------------------------
-import matplotlib.pyplot as plt
 import numpy as np
-from cpg_configuration import CpgConfig
-from phase_oscillator import oscillator
-from typing import List
+import copy
+from cpg_configuration import CpgConfig, CouplingGraph
+from phase_oscillator import OscillatorView
+from cpg_recorder import CpgRecorder
+from vector_cpg import VectorCpg
+from cpg_kernels import KernelBackend, select_backend
+from typing import List, Optional
 
 
-class BasicCpg():
-    def __init__(self, cpg_config: CpgConfig) -> None:
+class BasicCpg(VectorCpg):
+    def __init__(self, cpg_config: CpgConfig, exact_filters=False, backend="auto") -> None:
         """
         cpg_config: cpg parameters settings
+        exact_filters: integrate the amplitude and offset filters exactly instead of forward Euler
+        backend: engine of step() and simulate(), "numpy", "numba" or "auto" (numba when installed)
         """
 
-        self.name = getattr(cpg_config, "name")
-        self.config = cpg_config
-        self.numbers = cpg_config.oscillator_number
-        self.stepsize = cpg_config.time_step
-        self.v_stance = cpg_config.speed_stance
-        self.v_swing = cpg_config.speed_swing
-
-        # NEW amplitude vectors
-        self.amp_st = cpg_config.st_amplitude
-        self.amp_sw = cpg_config.sw_amplitude
-        self.amp_out = [0 for i in range(self.numbers)]
-        self.osc: List[oscillator] = [n for n in range(self.numbers)]
-
-        for i in range(self.numbers):
-            self.osc[i] = oscillator(self.stepsize, cpg_config.ar, cpg_config.ax,
-                                     cpg_config.st_amplitude[i],
-                                     cpg_config.sw_amplitude[i],
-                                     cpg_config.desired_offset[i],
-                                     cpg_config.initial_amplitude[i],
-                                     cpg_config.initial_offset[i])
-        self.theta = [0 for i in range(self.numbers)]
-
-        # state variable
-        self.phi = cpg_config.initial_phase
-        self.coupling_w = cpg_config.coupling_weights
-        self.coupling_phi = cpg_config.phase_lag_matrix
-        self.phase_vec = cpg_config.phase_lag_vector
+        super().__init__(cpg_config, exact_filters)
+        self.osc: List[OscillatorView] = [self.osc_bank[i] for i in range(self.numbers)]
+        self._edges = None          # (graph, adjacency) cache of coupling_edges
+        if exact_filters:
+            self.osc_bank.eqs.set_exact_coefficients(3, 1, (cpg_config.compiled.filter_transition,))
+        self._blend: Optional[GaitBlend] = None
+        self.backend = select_backend(backend)
+        self._kernel = KernelBackend(self) if self.backend == "numba" else None
 
         # print("oscillators: ",self.osc)
         # print("theta: ", self.theta)
@@ -54,6 +40,15 @@ class BasicCpg():
         # print("frequency: ", self.v)
         # print("coupling_phi: ", self.coupling_phi)
 
+    @property
+    def coupling_graph(self):
+        return self.graph
+
+    @coupling_graph.setter
+    def coupling_graph(self, graph):
+        self.graph = graph
+        self.parameters_changed()
+
     def _which_leg(self, joint_index):
         i = joint_index
         if i == self.numbers - 12 or i == self.numbers - 8 or i == self.numbers - 4:
@@ -96,17 +91,21 @@ class BasicCpg():
     def piecewise_fun(self, first_order_d):
         return (-first_order_d / abs(first_order_d) + 1) / 2
 
+    @property
+    def coupling_edges(self):
+        """
+        [(j, w_ij, phi_ij), ...] of every oscillator for update_phi, built from the coupling graph step() uses
+        """
+        if self._edges is None or self._edges[0] is not self.coupling_graph:
+            self._edges = (self.coupling_graph, self.coupling_graph.adjacency())
+        return self._edges[1]
+
     def update_r(self, phi_offset=0):
         fb = self.hip_feedback(phi_offset)
+        r_st, r_sw = self.osc_bank.update_r()
         for i in range(self.numbers):
-            r_st, r_sw = self.osc[i].update_r()
             leg_num = self._which_leg(i)
-            self.amp_out[i] = fb[leg_num] * (r_st - r_sw) + r_sw
-        return True
-
-    def update_x(self):
-        for osc in self.osc:
-            osc.update_x()
+            self.amp_out[i] = fb[leg_num] * (r_st[i] - r_sw[i]) + r_sw[i]
         return True
 
     def update_phi(self, phi_offset=0):
@@ -122,8 +121,8 @@ class BasicCpg():
 
         # print("Start update phi: ")
         for i in range(self.numbers):
-            for j in range(self.numbers):
-                sum[i] += self.coupling_w[i][j] * np.sin(self.phi[j] - self.phi[i] - self.coupling_phi[i][j])  # without times r
+            for j, w_ij, phi_ij in self.coupling_edges[i]:  # only the non zero coupling weights
+                sum[i] += w_ij * np.sin(self.phi[j] - self.phi[i] - phi_ij)  # without times r
                 # print("sum[{0}] : {1}".format(i, sum[i]))
 
             # independently control of the frequency of stance and swing phase
@@ -143,9 +142,142 @@ class BasicCpg():
         before update setpoints, we should update phi firstly
         """
         for i in range(self.numbers):
-            self.theta[i] = self.osc[i].offset_out + self.amp_out[i] * np.cos(self.phi[i])
+            self.theta[i] = self.osc_bank.offset_out[i] + self.amp_out[i] * np.cos(self.phi[i])
         return self.theta
 
+    def step(self, dt=None, phi_offset=0):
+        """
+        one tick of the VectorCpg engine, after the gait blend has advanced
+        the numba backend runs it in one compiled call when no blend is running
+        dt: step size of this tick, the configured time step by default
+        """
+        if self._kernel is not None and self._blend is None and (dt is None or dt == self.stepsize):
+            prof = self.profiler
+            if prof is not None:
+                start = prof.clock()
+            self._kernel.step(phi_offset)
+            if prof is not None:
+                prof.lap("tick", start)
+                prof.lap("kernel", start)
+                self._check_profiler()
+            return self.theta
+        if self._blend is not None:
+            self._advance_blend(self.stepsize if dt is None else dt)
+        return super().step(dt, phi_offset)
+
+    def simulate(self, n_steps, phi_offset=0):
+        """
+        run n_steps ticks of step() and record theta, phi and r (amp_out)
+        returns three arrays of shape (n_steps, N), the numba backend runs all ticks in one compiled call
+        """
+        if self._kernel is not None and self._blend is None:
+            return self._kernel.simulate(n_steps, phi_offset)
+        return super().simulate(n_steps, phi_offset)
+
+    def set_gait(self, cpg_config: CpgConfig, blend_time=0):
+        """
+        switch to the gait of cpg_config in place, phases, amplitudes and offsets keep their current values
+        speeds, amplitude and offset targets, filter constants, coupling weights and phase lags are taken over,
+        the initial values of cpg_config are ignored
+        blend_time: seconds over which step() blends the speeds, targets, weights and phase lags
+                    from the current gait, 0 switches at the next tick
+        """
+        if cpg_config.oscillator_number != self.numbers:
+            raise ValueError("Gait {} has {} oscillators, expected {}!".format(
+                cpg_config.name, cpg_config.oscillator_number, self.numbers))
+        eqs = self.osc_bank.eqs
+        old = self.config
+        v_stance = np.array(cpg_config.speed_stance, dtype=float)
+        v_swing = np.array(cpg_config.speed_swing, dtype=float)
+        targets = np.concatenate([cpg_config.st_amplitude, cpg_config.sw_amplitude, cpg_config.desired_offset])
+        in_use = self.coupling_graph     # the config graph, or a half blended one during a blend
+        same_coupling = in_use is cpg_config.coupling_graph or (
+            in_use is old.coupling_graph and cpg_config.compiled.key == old.compiled.key)
+
+        if (cpg_config.ar, cpg_config.ax) != (old.ar, old.ax):
+            self.ar, self.ax = cpg_config.ar, cpg_config.ax
+            eqs.ar = np.repeat([cpg_config.ar, cpg_config.ar, cpg_config.ax], self.numbers)
+        if cpg_config.time_step != self.stepsize:
+            self.stepsize = eqs.stepsize = cpg_config.time_step
+        if eqs.exact:
+            eqs.set_exact_coefficients(3, 1, (cpg_config.compiled.filter_transition,))
+
+        self._blend = None
+        if blend_time > 0:
+            if not same_coupling:
+                # the graph in use and the new gait on the union of their edges, blended weights and lags
+                # live in a copy, edges the graph in use lacks start from the new lag with zero weight
+                weights = np.zeros((self.numbers, self.numbers))
+                weights[in_use.rows, in_use.cols] = in_use.weights
+                lags = np.array(cpg_config.phase_lag_matrix, dtype=float)
+                lags[in_use.rows, in_use.cols] = in_use.lags
+                pair = CouplingGraph(np.stack([weights, cpg_config.coupling_weights]),
+                                     np.stack([lags, cpg_config.phase_lag_matrix]))
+                graph = copy.copy(pair)
+                graph.weights = pair.weights[0].copy()
+                graph.lags = pair.lags[0].copy()
+                self.coupling_graph = graph
+                lag_delta = (pair.lags[1] - pair.lags[0] + np.pi) % (2 * np.pi) - np.pi  # shortest way round
+                self._blend = GaitBlend(blend_time, cpg_config,
+                                        [(self.v_stance, v_stance), (self.v_swing, v_swing), (eqs.R, targets),
+                                         (graph.weights, pair.weights[1])],
+                                        (graph.lags, pair.lags[0], lag_delta))
+            else:
+                self._blend = GaitBlend(blend_time, cpg_config,
+                                        [(self.v_stance, v_stance), (self.v_swing, v_swing), (eqs.R, targets)])
+        else:
+            self.v_stance = v_stance
+            self.v_swing = v_swing
+            eqs.R[:] = targets
+            if not same_coupling:
+                self.coupling_graph = cpg_config.coupling_graph
+
+        # speeds and targets are read from the engine arrays above, the other attributes follow the new gait
+        self.name = cpg_config.name
+        self.config = cpg_config
+        self.coupling_w = np.array(cpg_config.coupling_weights, dtype=float)
+        self.coupling_phi = np.asarray(cpg_config.phase_lag_matrix, dtype=float)
+        self.phase_vec = cpg_config.phase_lag_vector
+        self.parameters_changed()
+        return True
+
+    def _advance_blend(self, dt):
+        self._edges = None
+        self.parameters_changed()
+        blend = self._blend
+        blend.elapsed += dt
+        a = min(blend.elapsed / blend.duration, 1.0)
+        for current, start, end in blend.vectors:
+            np.multiply(start, 1 - a, out=current)
+            current += a * end
+        if blend.lags is not None:
+            current, start, delta = blend.lags
+            np.multiply(delta, a, out=current)
+            current += start
+        if a >= 1:
+            self.coupling_graph = blend.config.coupling_graph
+            self._blend = None
+
+    @property
+    def blending(self):
+        return self._blend is not None
+
+    def stream(self, n_steps=None, phi_offset=0, recorder: Optional[CpgRecorder] = None):
+        """
+        generator of setpoints, one (N,) array per tick
+        the same array is refilled every tick, copy it to keep a value
+        n_steps: number of ticks, None for an endless stream
+        recorder: optional CpgRecorder or TrajectoryWriter, given theta, phi, r and offset every tick
+        """
+        theta = np.zeros(self.numbers)
+        k = 0
+        while n_steps is None or k < n_steps:
+            theta[:] = self.step(phi_offset=phi_offset)
+            if recorder is not None:
+                recorder.record(theta=theta, phi=self.phi, r=self.amp_out, offset=self.osc_bank.offset_out)
+            yield theta
+            k += 1
+
     def get_curr_amp(self, osc_num):
         return self.osc[osc_num].amp_st.get_pos(), self.osc[osc_num].amp_sw.get_pos()
 
@@ -153,96 +285,33 @@ class BasicCpg():
         return self.theta[osc_num]
 
     @staticmethod
-    def plot_all_results(spine, y1, y2, y3, num, label, title):
-        l = len(y1[0])  # e.g. if y1[0] has 1200 data points, l = len(y1) = 1200
-        t_interval = 1 / (10 ** (len(str(l)) - 2))  # this is 1/100
-        # print(t_interval)
-        # t_end = int(l * t_interval)    # 4
-        t_end = l * t_interval
-        # print(t_end)
-        t = np.arange(0, t_end, t_interval)
-        # print(l,':', t_end, ":", t_interval)
-        plt.figure(figsize=(16, 8))
-        plt.subplot(num + 0)
-        plt.plot(t, [i + 0.2 for i in spine[0]], color='green', label='θ 1: spine roll')
-        plt.plot(t, [i for i in spine[1]], color='brown', label='θ 2: spine pitch')
-        plt.plot(t, [i - 0.2 for i in spine[2]], color='purple', label='θ 3: spine yaw')
-        plt.axis([0, t_end, -0.35, 0.35])
-        plt.yticks([])
-        plt.xticks([])
-        plt.legend(loc="right")
-
-        plt.subplot(num + 1)
-        plt.plot(t, [i + 0.125 for i in y1[0]], color='red', label=label[0][0])
-        plt.plot(t, [i + 0.125 for i in y1[1]], color='blue', label=label[0][1])
-        plt.plot(t, y1[2], color='orange', label=label[0][2])
-        plt.plot(t, y1[3], color='black', label=label[0][3])
-        plt.axis([0, t_end, 0, 0.3])
-        plt.yticks([])
-        plt.xticks([])
-        # plt.title(title[0])
-        plt.legend(loc="right")
-        plt.subplot(num + 2)
-        plt.plot(t, [i + 2 for i in y2[0]], color='red', label=label[1][0])
-        plt.plot(t, [i + 2 for i in y2[1]], color='blue', label=label[1][1])
-        plt.plot(t, [i + 1 for i in y2[2]], color='orange', label=label[1][2])
-        plt.plot(t, [i + 1 for i in y2[3]], color='black', label=label[1][3])
-        plt.axis([0, t_end, 0.25, 3])
-        plt.yticks([])
-        plt.xticks([])
-        # plt.title(title[1])
-        plt.legend(loc="right")
-        plt.subplot(num + 3)
-        plt.plot(t, [i + 2.5 for i in y3[0]], color='red', label=label[2][0])
-        plt.plot(t, [i + 2.5 for i in y3[1]], color='blue', label=label[2][1])
-        plt.plot(t, [i + 1.75 for i in y3[2]], color='orange', label=label[2][2])
-        plt.plot(t, [i + 1.75 for i in y3[3]], color='black', label=label[2][3])
-        plt.axis([0, t_end, 1.25, 3.2])
-        plt.yticks([])
-        # plt.title(title[2])
-        plt.legend(loc="right")
-        # plt.tight_layout()
-        plt.show()
+    def plot_all_results(spine, y1, y2, y3, num, label, title, time_step=1 / 60):
+        """
+        spine: 3 spine joint trajectories, y1, y2, y3: 4 shoulder, hip and knee joint trajectories
+        time_step: time between two samples
+        """
+        import cpg_plotting     # matplotlib is only loaded when something is plotted
+        cpg_plotting.plot_all_results(spine, y1, y2, y3, num, label, title, time_step)
 
     @staticmethod
-    def plot_each_leg(y1, y2, y3, y4, num, label, title):
-        l = len(y1[0])
-        t_interval = 1 / (10 ** (len(str(l)) - 1))
-        # print(t_interval)
-        t_end = int(l * t_interval)
-        # print(t_end)
-        t = np.arange(0, t_end, t_interval)
-        # print(l,':', t_end, ":", t_interval)
-        plt.figure(figsize=(8, 6))
-
-        # right front leg
-        plt.subplot(num + 0)
-        plt.plot(t, y1[0], color='red', label=label[0][0])
-        plt.plot(t, y1[1], color='blue', label=label[0][1])
-        plt.plot(t, y1[2], color='orange', label=label[0][2])
-        plt.axis([0, t_end, -0.75, 0.6])
-        # plt.title(title[0])
-        plt.legend(loc="right")
-        plt.subplot(num + 1)
-        plt.plot(t, y2[0], color='red', label=label[1][0])
-        plt.plot(t, y2[1], color='blue', label=label[1][1])
-        plt.plot(t, y2[2], color='orange', label=label[1][2])
-        plt.axis([0, t_end, -0.75, 0.6])
-        # plt.title(title[1])
-        plt.legend(loc="right")
-        plt.subplot(num + 2)
-        plt.plot(t, y3[0], color='red', label=label[2][0])
-        plt.plot(t, y3[1], color='blue', label=label[2][1])
-        plt.plot(t, y3[2], color='orange', label=label[2][2])
-        plt.axis([0, t_end, -0.75, 0.6])
-        # plt.title(title[2])
-        plt.legend(loc="right")
-        plt.subplot(num + 3)
-        plt.plot(t, y4[0], color='red', label=label[3][0])
-        plt.plot(t, y4[1], color='blue', label=label[3][1])
-        plt.plot(t, y4[2], color='orange', label=label[3][2])
-        plt.axis([0, t_end, -0.75, 0.6])
-        # plt.title(title[2])
-        plt.legend(loc="right")
-        # plt.tight_layout()
-        plt.show()
\ No newline at end of file
+    def plot_each_leg(y1, y2, y3, y4, num, label, title, time_step=1 / 60):
+        """
+        y1 .. y4: shoulder, hip and knee joint trajectories of each leg
+        time_step: time between two samples
+        """
+        import cpg_plotting
+        cpg_plotting.plot_each_leg(y1, y2, y3, y4, num, label, title, time_step)
+
+
+class GaitBlend():
+    def __init__(self, duration, config: CpgConfig, vectors, lags=None) -> None:
+        """
+        linear blend of BasicCpg parameters towards a new gait
+        vectors: (current, end) pairs, current is updated in place and starts from a copy of itself
+        lags: optional (current, start, delta) of the coupling phase lags
+        """
+        self.duration = duration
+        self.elapsed = 0.0
+        self.config = config
+        self.vectors = [(current, current.copy(), end) for current, end in vectors]
+        self.lags = lags
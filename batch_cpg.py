@@ -0,0 +1,53 @@
+# ----------------------------------------------------------------
+# The University of york
+# The School of Physics, Engineering and Technology
+# Robotics and Autonomous System Lab
+# Author    : agent
+# File      : batch_cpg.py
+# Date      : 18-Oct-2026
+# Version:  :
+# ----------------------------------------------------------------
+import numpy as np
+from cpg_configuration import CpgConfig, CouplingGraph, leg_index_map
+from vector_cpg import VectorCpg
+from typing import List
+
+
+class BatchCpg(VectorCpg):
+    def __init__(self, cpg_configs: List[CpgConfig], exact_filters=False) -> None:
+        """
+        B independent CPGs stepped together, every state is a (B, N) array
+        cpg_configs: cpg parameters settings, all with the same oscillator number
+        exact_filters: see VectorCpg
+        """
+
+        if len(cpg_configs) == 0:
+            raise ValueError("At least one cpg config is required!")
+        numbers = {c.oscillator_number for c in cpg_configs}
+        if len(numbers) != 1:
+            raise ValueError("All configs must have the same oscillator number, got {}!".format(sorted(numbers)))
+
+        def stack(attr):
+            return np.array([getattr(c, attr) for c in cpg_configs], dtype=float)
+
+        def column(attr):
+            return stack(attr)[:, None]
+
+        self.name = [c.name for c in cpg_configs]
+        self.config = cpg_configs
+        self.batch = len(cpg_configs)
+        self.numbers = numbers.pop()
+        self.stepsize = column("time_step")
+        self.ar = column("ar")
+        self.ax = column("ax")
+        self._build(stack("speed_stance"), stack("speed_swing"),
+                    stack("st_amplitude"), stack("sw_amplitude"), stack("desired_offset"),
+                    stack("initial_amplitude"), stack("initial_offset"), stack("initial_phase"),
+                    exact_filters)
+
+        self.coupling_w = stack("coupling_weights")
+        self.coupling_phi = stack("phase_lag_matrix")
+        # union of the edges of all configs, weights and lags are (B, E)
+        self.graph = CouplingGraph(self.coupling_w, self.coupling_phi)
+        self.phase_vec = stack("phase_lag_vector")
+        self.legs = leg_index_map(self.numbers)
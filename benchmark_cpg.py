@@ -0,0 +1,222 @@
+# ----------------------------------------------------------------
+# The University of york
+# The School of Physics, Engineering and Technology
+# Robotics and Autonomous System Lab
+# Author    : agent
+# File      : benchmark_cpg.py
+# Date      : 18-Oct-2026
+# Version:  :
+# ----------------------------------------------------------------
+# Micro and macro benchmarks of the CPG hot paths.
+#   python benchmark_cpg.py                              run and print every case
+#   python benchmark_cpg.py --json out.json              also write the results as JSON
+#   python benchmark_cpg.py --save-baseline base.json    store the results as a baseline
+#   python benchmark_cpg.py --baseline base.json         compare with a baseline, exit 1 on a regression
+#   python benchmark_cpg.py startup                      cold start of a fresh interpreter to the first setpoint
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+import numpy as np
+import trot_parameters as tp
+from cpg_configuration import CpgConfig
+from differential_funs import DifferentialEq
+from basic_cpg import BasicCpg
+from vector_cpg import VectorCpg
+import cpg_kernels
+from cpg_profiler import CpgProfiler
+
+OSCILLATOR_COUNTS = (16, 32, 64)
+HORIZONS = (60, 600)
+
+
+def scaled_trot_config(numbers):
+    """
+    trot gait with numbers - 16 extra spine oscillators chained in front of the reference oscillator
+    """
+    extra = numbers - tp.OSCILLATOR_NUMBERS
+    if extra < 0:
+        raise ValueError("At least {} oscillators are required, got {}!".format(tp.OSCILLATOR_NUMBERS, numbers))
+    weights = np.zeros((numbers, numbers))
+    weights[extra:, extra:] = tp.COUPLING_WEIGHTS
+    for i in range(extra):
+        weights[i, i + 1] = weights[i + 1, i] = tp.CW_VALUE
+
+    def pad(vector, value=0):
+        return [value] * extra + list(vector)
+
+    return CpgConfig("trot_{}".format(numbers), numbers, tp.CONSTANT_AR, tp.CONSTANT_AX, tp.TIME_STEP,
+                     weights.tolist(), pad(tp.TROT_VECTOR), pad(tp.SPEED_STANCE, 1), pad(tp.SPEED_SWING, 1),
+                     pad(tp.STANCE_AMPLITUDE), pad(tp.SWING_AMPLITUDE), pad(tp.DESIRED_OFFSET),
+                     pad(tp.INITIAL_AMPLITUDE), pad(tp.INITIAL_OFFSET), pad(tp.INITIAL_PHASE))
+
+
+def legacy_tick(cpg: BasicCpg):
+    cpg.update_x()
+    cpg.update_r()
+    cpg.update_phi()
+    return cpg.update_setpoints()
+
+
+def trajectory(cls, config, horizon, tick, **options):
+    def run():
+        cpg = cls(config, **options)
+        for _ in range(horizon):
+            tick(cpg)
+    return run
+
+
+def cases():
+    """
+    name -> zero argument callable, the CPGs are created once and keep running between calls
+    """
+    cpg = BasicCpg(tp.trot_parameters, backend="numpy")
+    for _ in range(300):      # past the transient
+        cpg.step()
+    profiled = BasicCpg(tp.trot_parameters, backend="numpy")
+    profiled.profiler = CpgProfiler()
+    eqs = [DifferentialEq(tp.CONSTANT_AR, 0.3, tp.TIME_STEP) for _ in range(5)]
+    config = tp.trot_parameters
+
+    bench = {
+        "micro.hip_feedback": lambda: cpg.hip_feedback(0),
+        "micro.update_r": lambda: cpg.update_r(),
+        "micro.update_phi": lambda: cpg.update_phi(),
+        "micro.create_phase_matrix": lambda: config.create_phase_matrix(tp.TROT_VECTOR),
+        "tick.legacy": lambda: legacy_tick(cpg),
+        "tick.step": lambda: cpg.step(),
+        "tick.profiled": lambda: profiled.step(),
+    }
+    for k, eq in enumerate(eqs, 1):
+        bench["micro.update_amp_{}".format(k)] = getattr(eq, "update_amp_{}".format(k))
+    for n in OSCILLATOR_COUNTS:
+        scaled = scaled_trot_config(n)
+        for horizon in HORIZONS:
+            bench["trajectory.step[N={},T={}]".format(n, horizon)] = trajectory(BasicCpg, scaled, horizon, BasicCpg.step,
+                                                                                 backend="numpy")
+            bench["trajectory.vector[N={},T={}]".format(n, horizon)] = trajectory(VectorCpg, scaled, horizon, VectorCpg.step)
+    if cpg_kernels.HAVE_NUMBA:
+        jit = BasicCpg(tp.trot_parameters, backend="numba")
+        jit.simulate(300)       # compiles the kernel and skips the transient
+        bench["tick.numba"] = lambda: jit.step()
+        for n in OSCILLATOR_COUNTS:
+            scaled = scaled_trot_config(n)
+            for horizon in HORIZONS:
+                bench["trajectory.numba[N={},T={}]".format(n, horizon)] = \
+                    lambda scaled=scaled, horizon=horizon: BasicCpg(scaled, backend="numba").simulate(horizon)
+    return bench
+
+
+STARTUP_CASES = ("startup.import", "startup.first_setpoint")
+
+# run in a fresh interpreter, so nothing is imported yet
+COLD_START = """
+import sys, time, json
+t0 = time.perf_counter()
+from trot_parameters import trot_parameters
+from basic_cpg import BasicCpg
+t1 = time.perf_counter()
+BasicCpg(trot_parameters).step()
+t2 = time.perf_counter()
+print(json.dumps({"import": t1 - t0, "first_setpoint": t2 - t0, "matplotlib": "matplotlib" in sys.modules}))
+"""
+
+
+def cold_start(repeat=5):
+    """
+    import time and time to the first setpoint of a fresh process, the interpreter start itself is excluded
+    """
+    runs = [json.loads(subprocess.run([sys.executable, "-c", COLD_START], check=True, capture_output=True,
+                                      text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout)
+            for _ in range(repeat)]
+    results = {}
+    for name in STARTUP_CASES:
+        times = np.array([r[name.split(".", 1)[1]] for r in runs]) * 1e6
+        results[name] = {"median_us": float(np.median(times)), "min_us": float(times.min()), "calls": 1}
+    if any(r["matplotlib"] for r in runs):
+        print("warning: matplotlib is imported on the control path")
+    return results
+
+
+def measure(fn, min_time=0.05, repeat=5):
+    """
+    seconds per call of fn, as the median and minimum over repeat rounds
+    """
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    rounds = np.array(timer.repeat(repeat, number)) / number
+    return {"median_us": float(np.median(rounds) * 1e6), "min_us": float(rounds.min() * 1e6), "calls": number}
+
+
+def is_selected(name, selected):
+    return not selected or any(s in name for s in selected)
+
+
+def run(selected=None, min_time=0.05, repeat=5):
+    results = {}
+    for name, fn in cases().items():
+        if not is_selected(name, selected):
+            continue
+        results[name] = measure(fn, min_time, repeat)
+        print("{:<36}{:>14.2f}{:>14.2f}".format(name, results[name]["median_us"], results[name]["min_us"]))
+    if any(is_selected(name, selected) for name in STARTUP_CASES):
+        for name, result in cold_start(repeat).items():
+            if is_selected(name, selected):
+                results[name] = result
+                print("{:<36}{:>14.2f}{:>14.2f}".format(name, result["median_us"], result["min_us"]))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    print current / baseline median ratios, returns the names that got slower than 1 + tolerance
+    """
+    regressions = []
+    print("\n{:<36}{:>14}{:>14}".format("compared with baseline", "ratio", ""))
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result["median_us"] / baseline[name]["median_us"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            flag = "SLOWER"
+        elif ratio < 1 - tolerance:
+            flag = "faster"
+        print("{:<36}{:>14.2f}{:>14}".format(name, ratio, flag))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CPG benchmark suite")
+    parser.add_argument("cases", nargs="*", help="only run cases whose name contains one of these strings")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare with the results stored in this file")
+    parser.add_argument("--save-baseline", help="store the results as a baseline in this file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown (default 0.2)")
+    parser.add_argument("--min-time", type=float, default=0.05, help="seconds per timing round (default 0.05)")
+    parser.add_argument("--repeat", type=int, default=5, help="timing rounds per case (default 5)")
+    args = parser.parse_args(argv)
+
+    print("{:<36}{:>14}{:>14}".format("case [us per call]", "median", "min"))
+    results = run(args.cases, args.min_time, args.repeat)
+    document = {"python": platform.python_version(), "numpy": np.__version__,
+                "machine": platform.machine(), "results": results}
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(document, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,23 +7,120 @@
 # Date      : 27-Nov-2023
 # Version:  : 
 # ----------------------------------------------------------------
+import hashlib
 import numpy as np
+from differential_funs import first_order_transition
+
+
+def leg_index_map(numbers):
+    """
+    leg number of each oscillator, the same mapping as BasicCpg._which_leg
+    (spine oscillators are gated by leg 0)
+    """
+    if numbers < 12:
+        raise ValueError("At least 12 leg oscillators are required, got {}!".format(numbers))
+    legs = np.zeros(numbers, dtype=np.intp)
+    legs[numbers - 12:] = np.arange(12) % 4
+    return legs
+
+
+class CouplingGraph:
+    def __init__(self, weights, lag_matrix) -> None:
+        """
+        coupling weights and phase lags stored as an edge list in CSR order (sorted by row)
+        weights, lag_matrix: (..., N, N), an edge is kept if any leading entry is non zero
+        """
+        weights = np.asarray(weights, dtype=float)
+        lag_matrix = np.asarray(lag_matrix, dtype=float)
+        self.numbers = weights.shape[-1]
+        pattern = np.any(weights != 0, axis=tuple(range(weights.ndim - 2)))
+        self.rows, self.cols = (np.ascontiguousarray(i) for i in np.nonzero(pattern))   # nonzero gives strided views
+        self.weights = weights[..., self.rows, self.cols]
+        self.lags = np.broadcast_to(lag_matrix, weights.shape)[..., self.rows, self.cols]
+        self.indptr = np.searchsorted(self.rows, np.arange(self.numbers + 1))
+        self._nonempty = np.flatnonzero(np.diff(self.indptr))
+        self._starts = self.indptr[self._nonempty]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def adjacency(self):
+        """
+        [(j, w_ij, phi_ij), ...] for every oscillator i, as python floats
+        """
+        return [[(int(self.cols[e]), float(self.weights[e]), float(self.lags[e]))
+                 for e in range(self.indptr[i], self.indptr[i + 1])]
+                for i in range(self.numbers)]
+
+    def workspace(self, batch_shape=()):
+        """
+        scratch arrays for coupling_sum, two per edge and one per oscillator with edges
+        """
+        edges = tuple(batch_shape) + (len(self.rows),)
+        return np.empty(edges), np.empty(edges), np.empty(tuple(batch_shape) + (len(self._nonempty),))
+
+    def coupling_sum(self, phi, out=None, work=None):
+        """
+        sum_j w_ij * sin(phi_j - phi_i - phi_ij) over the edges of every oscillator i
+        phi: (..., N)
+        out, work: optional result array and workspace(), given both nothing is allocated
+        """
+        if out is None:
+            out = np.empty(phi.shape)
+        if work is None:
+            work = self.workspace(phi.shape[:-1])
+        terms, phi_i, sums = work
+        np.take(phi, self.cols, axis=-1, out=terms, mode="clip")
+        np.take(phi, self.rows, axis=-1, out=phi_i, mode="clip")
+        terms -= phi_i
+        terms -= self.lags
+        np.sin(terms, out=terms)
+        terms *= self.weights
+        if len(self._nonempty) == self.numbers:
+            np.add.reduceat(terms, self._starts, axis=-1, out=out)
+        else:
+            out.fill(0)
+            if len(self.rows):
+                np.add.reduceat(terms, self._starts, axis=-1, out=sums)
+                out[..., self._nonempty] = sums
+        return out
+
+
+class CompiledGait:
+    def __init__(self, key, phase_lag_matrix, coupling_graph: CouplingGraph, legs, filter_transition) -> None:
+        """
+        artifacts derived from a gait, may be shared by several configs so they are treated as read-only
+        key: CpgConfig.gait_key of the gait
+        filter_transition: exact one step decay factors of the first order filters, in OscillatorBank row order
+        """
+        self.key = key
+        self.phase_lag_matrix = phase_lag_matrix
+        self.coupling_graph = coupling_graph
+        self.legs = legs
+        self.filter_transition = filter_transition
 
 
 class CpgConfig:
     def __init__(self, NAME: str, OSCILLATOR_NUMBERS: int, CONSTANT_AR: int, CONSTANT_AX: int, TIME_STEP: float,
                  COUPLING_WEIGHTS: list, PHASE_VECTOR: list, SPEED_STANCE: list, SPEED_SWING: list,
                  STANCE_AMPLITUDE: list, SWING_AMPLITUDE: list, DESIRED_OFFSET: list,
-                 INITIAL_AMPLITUDE: list, INITIAL_OFFSET: list, INITIAL_PHASE: list) -> None:
+                 INITIAL_AMPLITUDE: list, INITIAL_OFFSET: list, INITIAL_PHASE: list, cache=None) -> None:
+        """
+        cache: optional gait_cache.GaitCache, the compiled artifacts of a gait seen before are reused from it
+        """
         self.name = NAME
         self.oscillator_number = OSCILLATOR_NUMBERS
+        self.validate_lengths(COUPLING_WEIGHTS=COUPLING_WEIGHTS, PHASE_VECTOR=PHASE_VECTOR,
+                              SPEED_STANCE=SPEED_STANCE, SPEED_SWING=SPEED_SWING,
+                              STANCE_AMPLITUDE=STANCE_AMPLITUDE, SWING_AMPLITUDE=SWING_AMPLITUDE,
+                              DESIRED_OFFSET=DESIRED_OFFSET, INITIAL_AMPLITUDE=INITIAL_AMPLITUDE,
+                              INITIAL_OFFSET=INITIAL_OFFSET, INITIAL_PHASE=INITIAL_PHASE)
 
         # So that the phase lag can be edited
         self.phase_lag_vector = PHASE_VECTOR
 
         # matrix
         self.coupling_weights = COUPLING_WEIGHTS
-        self.phase_lag_matrix = self.create_phase_matrix(PHASE_VECTOR)
         self.speed_stance = SPEED_STANCE
         self.speed_swing = SPEED_SWING
         self.st_amplitude = STANCE_AMPLITUDE
@@ -38,15 +135,82 @@ class CpgConfig:
         self.ax = CONSTANT_AX
         self.time_step = TIME_STEP
 
+        # phase lag matrix and sparse form of coupling_weights and phase_lag_matrix
+        self.compiled = cache.compile(self) if cache is not None else self.compile()
+        self.phase_lag_matrix = np.array(self.compiled.phase_lag_matrix)     # editable, the compiled one may be shared
+        self.coupling_graph = self.compiled.coupling_graph
+
+    def validate_lengths(self, **vectors):
+        """
+        every vector needs one entry per oscillator, and COUPLING_WEIGHTS one such row per oscillator
+        """
+        n = self.oscillator_number
+        for name, vector in vectors.items():
+            if len(vector) != n:
+                raise ValueError("{} has {} entries, expected {}!".format(name, len(vector), n))
+        for i, row in enumerate(vectors.get("COUPLING_WEIGHTS", [])):
+            if len(row) != n:
+                raise ValueError("COUPLING_WEIGHTS row {} has {} entries, expected {}!".format(i, len(row), n))
+
+    def to_dict(self):
+        """
+        constructor arguments as plain python values, e.g. for a JSON header
+        """
+        def plain(value):
+            return np.asarray(value, dtype=float).tolist()
+
+        return {"NAME": self.name, "OSCILLATOR_NUMBERS": self.oscillator_number,
+                "CONSTANT_AR": self.ar, "CONSTANT_AX": self.ax, "TIME_STEP": self.time_step,
+                "COUPLING_WEIGHTS": plain(self.coupling_weights), "PHASE_VECTOR": plain(self.phase_lag_vector),
+                "SPEED_STANCE": plain(self.speed_stance), "SPEED_SWING": plain(self.speed_swing),
+                "STANCE_AMPLITUDE": plain(self.st_amplitude), "SWING_AMPLITUDE": plain(self.sw_amplitude),
+                "DESIRED_OFFSET": plain(self.desired_offset), "INITIAL_AMPLITUDE": plain(self.initial_amplitude),
+                "INITIAL_OFFSET": plain(self.initial_offset), "INITIAL_PHASE": plain(self.initial_phase)}
+
+    @classmethod
+    def from_dict(cls, values, cache=None):
+        return cls(cache=cache, **values)
+
+    def gait_key(self):
+        """
+        content hash of everything the compiled artifacts depend on
+        """
+        h = hashlib.sha256()
+        h.update(repr((self.oscillator_number, float(self.ar), float(self.ax), float(self.time_step))).encode())
+        h.update(np.asarray(self.coupling_weights, dtype=float).tobytes())
+        h.update(np.asarray(self.phase_lag_vector, dtype=float).tobytes())
+        return h.hexdigest()
+
+    def compile(self):
+        """
+        build the phase lag matrix, coupling graph, leg index map and exact filter coefficients
+        """
+        n = self.oscillator_number
+        matrix = self.create_phase_matrix(self.phase_lag_vector)
+        transition = first_order_transition(np.repeat([self.ar, self.ar, self.ax], n).astype(float), self.time_step)
+        return CompiledGait(self.gait_key(), matrix, CouplingGraph(self.coupling_weights, matrix),
+                            leg_index_map(n), transition)
+
+    def compile_coupling(self):
+        """
+        recompile the coupling after editing coupling_weights or phase_lag_matrix
+        compiled and coupling_graph are replaced, returns the new coupling_graph
+        """
+        matrix = np.array(self.phase_lag_matrix, dtype=float)
+        key = hashlib.sha256(self.gait_key().encode() + matrix.tobytes()).hexdigest()
+        self.compiled = CompiledGait(key, matrix, CouplingGraph(self.coupling_weights, matrix),
+                                     self.compiled.legs, self.compiled.filter_transition)
+        self.coupling_graph = self.compiled.coupling_graph
+        return self.coupling_graph
+
     def create_phase_matrix(self, initial_vector):
+        """
+        matrix[i][j] = initial_vector[j] - initial_vector[i], except that row 0 is initial_vector itself
+        and column 0 is its negative (the two agree whenever initial_vector[0] == 0)
+        """
         assert self.oscillator_number == len(initial_vector)
-        matrix = np.zeros((self.oscillator_number, self.oscillator_number))
-        matrix[0] = initial_vector
-        # print(len(matrix[0]))
-        for i in range(1, len(matrix)):
-            for j in range(i + 1, len(matrix[i])):
-                matrix[i][j] = initial_vector[j] - initial_vector[i]
-        for i in range(1, len(matrix)):
-            for j in range(0, i):  # i=12, j=0
-                matrix[i][j] = -matrix[j][i]
-        return matrix
\ No newline at end of file
+        vector = np.asarray(initial_vector, dtype=float)
+        matrix = vector[None, :] - vector[:, None]
+        matrix[0] = vector
+        matrix[1:, 0] = -vector[1:]
+        return matrix
@@ -0,0 +1,156 @@
+# ----------------------------------------------------------------
+# The University of york
+# The School of Physics, Engineering and Technology
+# Robotics and Autonomous System Lab
+# Author    : agent
+# File      : cpg_kernels.py
+# Date      : 18-Oct-2026
+# Version:  :
+# ----------------------------------------------------------------
+# Compiled backend of BasicCpg.step: the VectorCpg tick (hip feedback, filters, coupling and
+# setpoints) for many ticks in one call, without Python between the ticks. numba is optional,
+# without it, or when it cannot be imported or compile the kernel, BasicCpg keeps the NumPy engine.
+# numba is only imported when a BasicCpg selects its backend, not when this module is imported.
+import importlib.util
+import numpy as np
+
+HAVE_NUMBA = importlib.util.find_spec("numba") is not None
+
+BACKENDS = ("auto", "numpy", "numba")
+
+
+def run_ticks(n_steps, h, phi_offset, phi, pos, dy_1, R, ar, decay, legs, v_stance, v_swing,
+              indptr, cols, weights, lags, theta, amp_out, offset_out, theta_s, phi_s, r_s):
+    """
+    n_steps ticks of BasicCpg.step, the state arrays are updated in place
+    pos, dy_1, R, ar, decay: 3N filter rows [stance, swing, offset], pos <- R + (pos - R) * decay
+    indptr, cols, weights, lags: CouplingGraph in CSR order
+    theta_s, phi_s, r_s: (n_steps, N) outputs of every tick
+    """
+    n = len(phi)
+    gate_leg = np.zeros(4)
+    dy_phi = np.zeros(n)
+    for k in range(n_steps):
+        for m in range(4):
+            p = phi[n - 8 + m] + phi_offset
+            s = np.sin(p)
+            if s == 0:
+                gate_leg[m] = 1.0 if np.cos(p) >= 0 else 0.0
+            else:
+                gate_leg[m] = 1.0 if s > 0 else 0.0
+        for i in range(3 * n):
+            dy_1[i] = ar[i] * (R[i] - pos[i])
+            pos[i] = R[i] + (pos[i] - R[i]) * decay[i]
+        for i in range(n):
+            gate = gate_leg[legs[i]]
+            amp_out[i] = gate * (pos[i] - pos[n + i]) + pos[n + i]
+            offset_out[i] = pos[2 * n + i]
+            coupling = 0.0
+            for e in range(indptr[i], indptr[i + 1]):
+                coupling += weights[e] * np.sin(phi[cols[e]] - phi[i] - lags[e])
+            dy_phi[i] = 2 * np.pi * (gate * (v_stance[i] - v_swing[i]) + v_swing[i]) + coupling
+        for i in range(n):
+            phi[i] += dy_phi[i] * h
+            theta[i] = offset_out[i] + amp_out[i] * np.cos(phi[i])
+            theta_s[k, i] = theta[i]
+            phi_s[k, i] = phi[i]
+            r_s[k, i] = amp_out[i]
+
+
+_compiled_run_ticks = None
+_numba_error = None     # why numba could not be used, kept so "auto" does not retry on every CPG
+
+
+def _warm_up(kernel):
+    """
+    one tick of a small uncoupled network, so numba compiles run_ticks for the argument types of KernelBackend
+    """
+    n = 12
+    kernel(1, 1.0, 0.0, np.zeros(n), np.zeros(3 * n), np.zeros(3 * n), np.zeros(3 * n), np.zeros(3 * n),
+           np.zeros(3 * n), np.arange(n) % 4, np.zeros(n), np.zeros(n), np.zeros(n + 1, dtype=np.intp),
+           np.zeros(0, dtype=np.intp), np.zeros(0), np.zeros(0), np.zeros(n), np.zeros(n), np.zeros(n),
+           np.zeros((1, n)), np.zeros((1, n)), np.zeros((1, n)))
+
+
+def compiled_run_ticks():
+    """
+    run_ticks compiled by numba, compiled (or loaded from numba's cache) on the first call
+    raises ImportError when numba cannot be imported (e.g. it does not support the installed NumPy)
+    or cannot compile run_ticks
+    """
+    global _compiled_run_ticks, _numba_error
+    if _compiled_run_ticks is None:
+        if _numba_error is not None:
+            raise ImportError(_numba_error)
+        try:
+            import numba
+            kernel = numba.njit(cache=True)(run_ticks)
+            _warm_up(kernel)
+        except Exception as e:
+            _numba_error = "The numba backend is not usable: {!r}!".format(e)
+            raise ImportError(_numba_error) from e
+        _compiled_run_ticks = kernel
+    return _compiled_run_ticks
+
+
+def select_backend(backend):
+    """
+    name of the engine used for backend, "auto" is numba when it is installed and works, NumPy otherwise
+    """
+    if backend not in BACKENDS:
+        raise ValueError("Unknown backend {}, expected one of {}!".format(backend, BACKENDS))
+    if backend == "numba" and not HAVE_NUMBA:
+        raise ImportError("The numba backend requires the numba package!")
+    if backend == "auto":
+        if not HAVE_NUMBA:
+            return "numpy"
+        try:
+            compiled_run_ticks()
+        except ImportError:
+            return "numpy"
+        return "numba"
+    return backend
+
+
+class KernelBackend():
+    def __init__(self, cpg, compiled=True) -> None:
+        """
+        runs the ticks of a BasicCpg through run_ticks
+        the cpg arrays are shared, so the legacy update_* methods see the same state
+        compiled: use the numba version of run_ticks, the plain Python one is only useful for checks
+        """
+        self.cpg = cpg
+        self._run_ticks = compiled_run_ticks() if compiled else run_ticks
+        self._ar = None
+        self._h = None
+        self._euler = None
+        n = cpg.numbers
+        self._tick = (np.empty((1, n)), np.empty((1, n)), np.empty((1, n)))
+
+    def _decay(self):
+        eqs = self.cpg.osc_bank.eqs
+        if eqs.exact:
+            return eqs._exact_coefficients(3, 1)[0]
+        if eqs.ar is not self._ar or eqs.stepsize != self._h:
+            self._ar, self._h = eqs.ar, eqs.stepsize
+            self._euler = 1 - eqs.ar * eqs.stepsize
+        return self._euler
+
+    def run(self, n_steps, phi_offset, theta_s, phi_s, r_s):
+        cpg = self.cpg
+        eqs = cpg.osc_bank.eqs
+        graph = cpg.coupling_graph
+        self._run_ticks(n_steps, float(cpg.stepsize), float(phi_offset), cpg.phi, eqs.pos, eqs.dy_1, eqs.R, eqs.ar,
+                        self._decay(), cpg.legs, cpg.v_stance, cpg.v_swing, graph.indptr, graph.cols,
+                        graph.weights, graph.lags, cpg.theta, cpg.amp_out, cpg.osc_bank.offset_out,
+                        theta_s, phi_s, r_s)
+
+    def step(self, phi_offset=0):
+        self.run(1, phi_offset, *self._tick)
+        return self.cpg.theta
+
+    def simulate(self, n_steps, phi_offset=0):
+        n = self.cpg.numbers
+        out = np.empty((n_steps, n)), np.empty((n_steps, n)), np.empty((n_steps, n))
+        self.run(n_steps, phi_offset, *out)
+        return out
@@ -0,0 +1,159 @@
+# ----------------------------------------------------------------
+# The University of york
+# The School of Physics, Engineering and Technology
+# Robotics and Autonomous System Lab
+# Author    : agent
+# File      : cpg_plotting.py
+# Date      : 18-Oct-2026
+# Version:  :
+# ----------------------------------------------------------------
+import matplotlib.pyplot as plt
+import numpy as np
+from cpg_recorder import CpgRecorder
+
+
+def minmax_decimate(t, y, bins):
+    """
+    keep the minimum and maximum sample of each of bins equal time bins, in time order
+    the envelope of the curve is preserved, curves with at most 2 * bins samples are returned as they are
+    """
+    t = np.asarray(t)
+    y = np.asarray(y)
+    n = len(y)
+    if n <= 2 * bins:
+        return t, y
+    k = -(-n // bins)
+    idx = np.minimum(np.arange(bins * k), n - 1).reshape(bins, k)
+    chunks = y[idx]
+    rows = np.arange(bins)
+    lo = chunks.argmin(axis=1)
+    hi = chunks.argmax(axis=1)
+    sel = np.stack([idx[rows, np.minimum(lo, hi)], idx[rows, np.maximum(lo, hi)]], axis=1).ravel()
+    return t[sel], y[sel]
+
+
+def pixel_width(fig):
+    return int(fig.get_figwidth() * fig.dpi)
+
+
+def plot_curves(ax, t, curves, bins):
+    """
+    curves: (y, offset, color, label), y is decimated before the offset is added
+    """
+    for y, offset, color, label in curves:
+        td, yd = minmax_decimate(t, y, bins)
+        ax.plot(td, yd + offset, color=color, label=label)
+
+
+def plot_r(y):
+    """
+    one filter output against the tick number
+    """
+    y = np.asarray(y, dtype=float)
+    t = np.arange(len(y))
+    fig = plt.figure(figsize=(16, 8))
+    td, yd = minmax_decimate(t, y, pixel_width(fig))
+    plt.plot(td, yd, color='red')
+    plt.show()
+
+
+def plot_all_results(spine, y1, y2, y3, num, label, title, time_step):
+    """
+    spine: (3, T) spine joints, y1, y2, y3: (4, T) shoulder, hip and knee joints
+    """
+    spine, y1, y2, y3 = (np.asarray(y, dtype=float) for y in (spine, y1, y2, y3))
+    l = y1.shape[1]
+    t = (np.arange(l) + 1) * time_step
+    t_end = l * time_step
+    fig = plt.figure(figsize=(16, 8))
+    bins = pixel_width(fig)
+    ax = plt.subplot(num + 0)
+    plot_curves(ax, t, [(spine[0], 0.2, 'green', 'θ 1: spine roll'),
+                        (spine[1], 0, 'brown', 'θ 2: spine pitch'),
+                        (spine[2], -0.2, 'purple', 'θ 3: spine yaw')], bins)
+    plt.axis([0, t_end, -0.35, 0.35])
+    plt.yticks([])
+    plt.xticks([])
+    plt.legend(loc="right")
+
+    ax = plt.subplot(num + 1)
+    plot_curves(ax, t, [(y1[0], 0.125, 'red', label[0][0]), (y1[1], 0.125, 'blue', label[0][1]),
+                        (y1[2], 0, 'orange', label[0][2]), (y1[3], 0, 'black', label[0][3])], bins)
+    plt.axis([0, t_end, 0, 0.3])
+    plt.yticks([])
+    plt.xticks([])
+    plt.legend(loc="right")
+
+    ax = plt.subplot(num + 2)
+    plot_curves(ax, t, [(y2[0], 2, 'red', label[1][0]), (y2[1], 2, 'blue', label[1][1]),
+                        (y2[2], 1, 'orange', label[1][2]), (y2[3], 1, 'black', label[1][3])], bins)
+    plt.axis([0, t_end, 0.25, 3])
+    plt.yticks([])
+    plt.xticks([])
+    plt.legend(loc="right")
+
+    ax = plt.subplot(num + 3)
+    plot_curves(ax, t, [(y3[0], 2.5, 'red', label[2][0]), (y3[1], 2.5, 'blue', label[2][1]),
+                        (y3[2], 1.75, 'orange', label[2][2]), (y3[3], 1.75, 'black', label[2][3])], bins)
+    plt.axis([0, t_end, 1.25, 3.2])
+    plt.yticks([])
+    plt.legend(loc="right")
+    plt.show()
+
+
+def plot_each_leg(y1, y2, y3, y4, num, label, title, time_step):
+    """
+    y1 .. y4: (3, T) shoulder, hip and knee joints of each leg
+    """
+    legs = [np.asarray(y, dtype=float) for y in (y1, y2, y3, y4)]
+    l = legs[0].shape[1]
+    t = (np.arange(l) + 1) * time_step
+    t_end = l * time_step
+    fig = plt.figure(figsize=(8, 6))
+    bins = pixel_width(fig)
+    for k, y in enumerate(legs):
+        ax = plt.subplot(num + k)
+        plot_curves(ax, t, [(y[0], 0, 'red', label[k][0]), (y[1], 0, 'blue', label[k][1]),
+                            (y[2], 0, 'orange', label[k][2])], bins)
+        plt.axis([0, t_end, -0.75, 0.6])
+        plt.legend(loc="right")
+    plt.show()
+
+
+class LivePlot():
+    def __init__(self, joints, time_step, window=5.0, labels=None, ylim=(-0.75, 0.75), redraw_every=6) -> None:
+        """
+        scrolling plot of the last window seconds of some joints, for a running controller
+        joints: oscillator indices to show, redraw_every: ticks between two redraws
+        """
+        self.joints = list(joints)
+        self.time_step = time_step
+        self.window = window
+        self.redraw_every = redraw_every
+        self.recorder = CpgRecorder.last_seconds(window, time_step, len(self.joints), fields=("theta",))
+        self.fig, self.ax = plt.subplots(figsize=(10, 4))
+        labels = labels or ["θ {}".format(j + 1) for j in self.joints]
+        self.lines = [self.ax.plot([], [], label=label)[0] for label in labels]
+        self.ax.set_ylim(*ylim)
+        self.ax.set_xlim(0, window)
+        self.ax.legend(loc="right")
+        self.bins = pixel_width(self.fig)
+        plt.ion()
+        plt.show(block=False)
+
+    def update(self, theta):
+        """
+        add one tick of setpoints, the figure is redrawn every redraw_every ticks
+        """
+        self.recorder.record(theta=np.asarray(theta)[self.joints])
+        count = self.recorder.count
+        if count % self.redraw_every:
+            return
+        data = self.recorder.get("theta")
+        t = (np.arange(count - len(data), count) + 1) * self.time_step
+        for k, line in enumerate(self.lines):
+            line.set_data(*minmax_decimate(t, data[:, k], self.bins))
+        start = max(t[-1] - self.window, 0)
+        self.ax.set_xlim(start, start + self.window)
+        self.fig.canvas.draw_idle()
+        self.fig.canvas.flush_events()
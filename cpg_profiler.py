@@ -0,0 +1,121 @@
+# ----------------------------------------------------------------
+# The University of york
+# The School of Physics, Engineering and Technology
+# Robotics and Autonomous System Lab
+# Author    : agent
+# File      : cpg_profiler.py
+# Date      : 18-Oct-2026
+# Version:  :
+# ----------------------------------------------------------------
+import time
+import numpy as np
+
+# stages of BasicCpg.step(), "tick" is the whole step
+STAGES = ("hip_feedback", "filters", "update_phi", "update_setpoints", "kernel", "tick")
+PROMETHEUS_BUCKETS_US = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class LatencyHistogram():
+    def __init__(self, bin_us=10, max_us=20000) -> None:
+        """
+        fixed-bin histogram of durations, preallocated so adding a sample does not allocate
+        samples above max_us are counted in the last bin
+        """
+        self.bin_us = bin_us
+        self.counts = np.zeros(int(max_us // bin_us) + 1, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        us = seconds * 1e6
+        i = int(us // self.bin_us) if us > 0 else 0
+        self.counts[min(i, len(self.counts) - 1)] += 1
+        self.count += 1
+        self.total += us
+        if us > self.max:
+            self.max = us
+
+    def percentile(self, q):
+        """
+        upper edge of the bin holding the q-th percentile, in microseconds
+        """
+        if self.count == 0:
+            return 0.0
+        i = int(np.searchsorted(np.cumsum(self.counts), q / 100 * self.count))
+        return (min(i, len(self.counts) - 1) + 1) * self.bin_us
+
+    def summary(self):
+        return {"count": self.count,
+                "mean_us": self.total / self.count if self.count else 0.0,
+                "p50_us": self.percentile(50),
+                "p99_us": self.percentile(99),
+                "max_us": self.max}
+
+    def clear(self):
+        self.counts[:] = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class CpgProfiler():
+    def __init__(self, stages=STAGES, bin_us=1, max_us=5000, n_ticks=None, clock=time.perf_counter) -> None:
+        """
+        per-stage call counts, cumulative time and LatencyHistogram of BasicCpg.step()
+        n_ticks: the cpg stops profiling by itself after this many ticks, None for no limit
+        """
+        self.stages = tuple(stages)
+        self.histograms = {stage: LatencyHistogram(bin_us, max_us) for stage in self.stages}
+        self.n_ticks = n_ticks
+        self.clock = clock
+
+    @property
+    def ticks(self):
+        return self.histograms["tick"].count
+
+    @property
+    def done(self):
+        return self.n_ticks is not None and self.ticks >= self.n_ticks
+
+    def lap(self, stage, start):
+        """
+        add the time since start to stage, returns the current time as the start of the next stage
+        """
+        now = self.clock()
+        self.histograms[stage].add(now - start)
+        return now
+
+    def clear(self):
+        for histogram in self.histograms.values():
+            histogram.clear()
+
+    def to_dict(self):
+        """
+        {stage: LatencyHistogram.summary() plus total_us} of the stages that ran
+        """
+        result = {}
+        for stage, histogram in self.histograms.items():
+            if histogram.count:
+                result[stage] = dict(histogram.summary(), total_us=histogram.total)
+        return result
+
+    def prometheus(self, prefix="cpg"):
+        """
+        the histograms in the Prometheus text exposition format, one series per stage
+        """
+        name = prefix + "_stage_seconds"
+        lines = ["# HELP {} Time spent in each stage of a CPG tick.".format(name),
+                 "# TYPE {} histogram".format(name)]
+        for stage, histogram in self.histograms.items():
+            if not histogram.count:
+                continue
+            cumulative = np.cumsum(histogram.counts)
+            for le in PROMETHEUS_BUCKETS_US:
+                i = min(int(le // histogram.bin_us), len(cumulative)) - 1
+                count = cumulative[i] if i >= 0 else 0
+                lines.append('{}_bucket{{stage="{}",le="{:g}"}} {}'.format(name, stage, le * 1e-6, count))
+            lines.append('{}_bucket{{stage="{}",le="+Inf"}} {}'.format(name, stage, histogram.count))
+            lines.append('{}_sum{{stage="{}"}} {:.9g}'.format(name, stage, histogram.total * 1e-6))
+            lines.append('{}_count{{stage="{}"}} {}'.format(name, stage, histogram.count))
+        return "\n".join(lines) + "\n"
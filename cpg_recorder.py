@@ -0,0 +1,59 @@
+# ----------------------------------------------------------------
+# The University of york
+# The School of Physics, Engineering and Technology
+# Robotics and Autonomous System Lab
+# Author    : agent
+# File      : cpg_recorder.py
+# Date      : 18-Oct-2026
+# Version:  :
+# ----------------------------------------------------------------
+import numpy as np
+
+
+class CpgRecorder():
+    def __init__(self, numbers, length, ring=False, fields=("theta", "phi", "r")) -> None:
+        """
+        preallocated (length, numbers) buffers, one per recorded field
+        ring: keep only the last length ticks instead of raising once the buffers are full
+        """
+        self.numbers = numbers
+        self.length = length
+        self.ring = ring
+        self.fields = tuple(fields)
+        self.buffers = {f: np.zeros((length, numbers)) for f in self.fields}
+        self.count = 0      # ticks recorded so far, including overwritten ones
+
+    @classmethod
+    def last_seconds(cls, seconds, time_step, numbers, fields=("theta", "phi", "r")):
+        """
+        ring buffer holding the last seconds of a run
+        """
+        return cls(numbers, int(round(seconds / time_step)), True, fields)
+
+    def __len__(self):
+        return min(self.count, self.length)
+
+    def record(self, **values):
+        """
+        copy one tick into the buffers, every field must be given, other values are ignored
+        """
+        if self.count >= self.length and not self.ring:
+            raise BufferError("Recorder is full after {} ticks!".format(self.length))
+        i = self.count % self.length
+        for f in self.fields:
+            self.buffers[f][i] = values[f]
+        self.count += 1
+
+    def get(self, field):
+        """
+        recorded ticks of field in time order, (len(self), numbers)
+        a view until a ring buffer wraps around, a copy afterwards
+        """
+        buf = self.buffers[field]
+        if self.count <= self.length:
+            return buf[:self.count]
+        i = self.count % self.length
+        return np.concatenate([buf[i:], buf[:i]])
+
+    def clear(self):
+        self.count = 0
@@ -8,12 +8,60 @@
 # Version:  : 
 # ----------------------------------------------------------------
 
-import matplotlib.pyplot as plt
 import numpy as np
+from functools import lru_cache
+
+
+def damping_terms(kind, ar):
+    """
+    (c, k) of the linear second order equations pos'' = k * (R - pos) - c * pos'
+    kind 1: update_amp_1, kind 2: update_amp_2
+    """
+    if kind == 1:
+        return 3.0, 4.0
+    if kind == 2:
+        return ar, ar * ar / 4
+    raise ValueError("Equation {} is not a linear second order equation!".format(kind))
+
+
+def first_order_transition(ar, h):
+    """
+    exact decay factor of pos' = ar * (R - pos) over a time h
+    """
+    return np.exp(-ar * h)
+
+
+def second_order_transition(c, k, h):
+    """
+    exp(A * h) for A = [[0, 1], [-k, -c]], elementwise for scalars or arrays
+    returns (m11, m12, m21, m22)
+    """
+    q = c * c / 4 - k       # squared eigenvalue distance
+    s = np.sqrt(np.abs(q))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ch = np.where(q > 0, np.cosh(s * h), np.cos(s * h))
+        sh = np.where(s == 0, h, np.where(q > 0, np.sinh(s * h), np.sin(s * h)) / s)
+    e = np.exp(-c * h / 2)
+    return e * (ch + c / 2 * sh), e * sh, -e * k * sh, e * (ch - c / 2 * sh)
+
+
+@lru_cache(maxsize=256)
+def exact_coefficients(kind, ar, h):
+    """
+    cached transition coefficients of update_amp_1/2/3 for one (ar, h)
+    """
+    if kind == 3:
+        return float(first_order_transition(ar, h)),
+    c, k = damping_terms(kind, ar)
+    return tuple(float(m) for m in second_order_transition(c, k, h)) + (c, k)
 
 
 class DifferentialEq:
-    def __init__(self, ar, R, stp_size, pos=0) -> None:
+    def __init__(self, ar, R, stp_size, pos=0, exact=False) -> None:
+        """
+        exact: integrate the linear equations (update_amp_1/2/3) with the exact
+               exponential discretization instead of forward Euler
+        """
         self.dy_1 = 0
         self.dy_2 = 0
         self.R = R
@@ -21,14 +69,35 @@ class DifferentialEq:
 
         self.pos = pos
         self.stepsize = stp_size
+        self.exact = exact
+
+    def update_exact(self, kind, steps=1):
+        """
+        advance update_amp_<kind> (1, 2 or 3) exactly by steps time steps in O(1)
+        """
+        coeffs = exact_coefficients(kind, self.ar, self.stepsize * steps)
+        if kind == 3:
+            self.dy_1 = self.ar * (self.R - self.pos)
+            self.pos = self.R + (self.pos - self.R) * coeffs[0]
+            return self.pos
+        m11, m12, m21, m22, c, k = coeffs
+        y = self.pos - self.R
+        y, self.dy_1 = m11 * y + m12 * self.dy_1, m21 * y + m22 * self.dy_1
+        self.dy_2 = -k * y - c * self.dy_1
+        self.pos = self.R + y
+        return self.pos
 
     def update_amp_1(self):  # CPG driven locomotion control of quadruped robot
+        if self.exact:
+            return self.update_exact(1)
         self.dy_2 = 4 * (self.R - self.pos) - 3 / 2 * 2 * self.dy_1
         self.dy_1 += self.dy_2 * self.stepsize
         self.pos += self.dy_1 * self.stepsize
         return self.pos
 
     def update_amp_2(self):  # controlling swimming and crawling in a fish robot...
+        if self.exact:
+            return self.update_exact(2)
         a = 20
         self.dy_2 = self.ar * (self.ar / 4 * (self.R - self.pos) - self.dy_1)
         self.dy_1 += self.dy_2 * self.stepsize
@@ -36,6 +105,8 @@ class DifferentialEq:
         return self.pos
 
     def update_amp_3(self):  # towards dynamic trot gait locomotion: design, control, and experiments with Cheetah-cub...
+        if self.exact:
+            return self.update_exact(3)
         self.dy_1 = self.ar * (self.R - self.pos)
         self.pos += self.dy_1 * self.stepsize
         return self.pos
@@ -50,19 +121,220 @@ class DifferentialEq:
         self.pos += self.dy_1 * self.stepsize
         return self.pos
 
+    def get_pos(self):
+        return self.pos
+
     @staticmethod
     def plot_r(y):
-        l = len(y)
-        # print(t_end)
-        t = np.arange(0, l, 1)
-        # print(l,':', t_end, ":", t_interval)
-        plt.figure(figsize=(16, 8))
-        # right front leg
-        plt.plot(t, y, color='red')
-        # plt.title(title[0])
-        # plt.legend(loc="right")
-        # plt.tight_layout()
-        plt.show()
+        import cpg_plotting     # matplotlib is only loaded when something is plotted
+        cpg_plotting.plot_r(y)
+
+
+class DifferentialBank:
+    def __init__(self, ar, R, stp_size, pos=0, exact=False) -> None:
+        """
+        struct-of-arrays version of DifferentialEq, one row per equation along the last axis
+        R: (..., M), leading axes hold independent banks, e.g. a batch of CPGs
+        ar, pos: scalars or arrays broadcast to the shape of R
+        exact: see DifferentialEq
+        """
+        self.R = np.array(R, dtype=float)
+        self._coeffs = {}
+        self.version = 0        # bumped when R, ar or the step size change through a setter
+        self.ar = ar
+        self.pos = np.array(np.broadcast_to(pos, self.R.shape), dtype=float)
+        self.dy_1 = np.zeros(self.R.shape)
+        self.dy_2 = np.zeros(self.R.shape)
+        self._work = np.zeros(self.R.shape)     # scratch of update_amp_3, which allocates nothing
+        self.stepsize = stp_size
+        self.exact = exact
+
+    def __len__(self):
+        return self.R.shape[-1]
+
+    def __getitem__(self, index):
+        return DifferentialView(self, index)
+
+    def parameters_changed(self):
+        self.version += 1
+
+    # the exact coefficients depend on ar and the step size, drop them when either changes
+    @property
+    def ar(self):
+        return self._ar
+
+    @ar.setter
+    def ar(self, value):
+        self._ar = np.array(np.broadcast_to(value, self.R.shape), dtype=float)
+        self._coeffs.clear()
+        self.parameters_changed()
+
+    @property
+    def stepsize(self):
+        return self._stepsize
+
+    @stepsize.setter
+    def stepsize(self, value):
+        self._stepsize = value
+        self._coeffs.clear()
+        self.parameters_changed()
+
+    def _exact_coefficients(self, kind, steps):
+        key = (kind, steps)
+        if key not in self._coeffs:
+            h = self._stepsize * steps
+            if kind == 3:
+                self._coeffs[key] = (first_order_transition(self._ar, h),)
+            else:
+                c, k = damping_terms(kind, self._ar)
+                c, k = np.broadcast_to(c, self._ar.shape), np.broadcast_to(k, self._ar.shape)
+                self._coeffs[key] = second_order_transition(c, k, h) + (c, k)
+        return self._coeffs[key]
+
+    def set_exact_coefficients(self, kind, steps, coeffs):
+        """
+        provide precomputed coefficients for update_exact(kind, steps=steps), e.g. from a CompiledGait
+        """
+        self._coeffs[(kind, steps)] = tuple(coeffs)
+
+    def update_exact(self, kind, index=slice(None), steps=1):
+        """
+        advance update_amp_<kind> (1, 2 or 3) exactly by steps time steps in O(1)
+        """
+        if kind == 3:
+            pos, y, dy_1 = self.pos[..., index], self._work[..., index], self.dy_1[..., index]
+            np.subtract(pos, self.R[..., index], out=y)
+            np.multiply(self._ar[..., index], y, out=dy_1)
+            np.negative(dy_1, out=dy_1)
+            y *= self._exact_coefficients(3, steps)[0][..., index]
+            np.add(self.R[..., index], y, out=pos)
+            return self._store(index, pos, dy_1)
+        coeffs = [m[..., index] for m in self._exact_coefficients(kind, steps)]
+        R = self.R[..., index]
+        y = self.pos[..., index] - R
+        m11, m12, m21, m22, c, k = coeffs
+        v = self.dy_1[..., index]
+        y, v = m11 * y + m12 * v, m21 * y + m22 * v
+        self.dy_1[..., index] = v
+        self.dy_2[..., index] = -k * y - c * v
+        self.pos[..., index] = R + y
+        return self.pos[..., index]
+
+    # each update_amp_N advances the rows selected by index along the last axis (a slice keeps every access a view)
+    def update_amp_1(self, index=slice(None)):
+        if self.exact:
+            return self.update_exact(1, index)
+        self.dy_2[..., index] = 4 * (self.R[..., index] - self.pos[..., index]) - 3 / 2 * 2 * self.dy_1[..., index]
+        self.dy_1[..., index] += self.dy_2[..., index] * self.stepsize
+        self.pos[..., index] += self.dy_1[..., index] * self.stepsize
+        return self.pos[..., index]
+
+    def update_amp_2(self, index=slice(None)):
+        if self.exact:
+            return self.update_exact(2, index)
+        ar = self.ar[..., index]
+        self.dy_2[..., index] = ar * (ar / 4 * (self.R[..., index] - self.pos[..., index]) - self.dy_1[..., index])
+        self.dy_1[..., index] += self.dy_2[..., index] * self.stepsize
+        self.pos[..., index] += self.dy_1[..., index] * self.stepsize
+        return self.pos[..., index]
+
+    def update_amp_3(self, index=slice(None)):
+        if self.exact:
+            return self.update_exact(3, index)
+        pos, dy_1, step = self.pos[..., index], self.dy_1[..., index], self._work[..., index]
+        np.subtract(self.R[..., index], pos, out=dy_1)
+        dy_1 *= self.ar[..., index]
+        np.multiply(dy_1, self.stepsize, out=step)
+        pos += step
+        return self._store(index, pos, dy_1)
+
+    def _store(self, index, pos, dy_1):
+        """
+        update_amp_3 works on the rows selected by index in place, which only views allow,
+        integer array and boolean indexes give copies that are written back here
+        """
+        if not isinstance(index, (slice, int, np.integer)):
+            self.pos[..., index] = pos
+            self.dy_1[..., index] = dy_1
+        return pos
+
+    def update_amp_4(self, index=slice(None)):
+        pos = self.pos[..., index]
+        self.dy_1[..., index] = self.ar[..., index] * (self.R[..., index] - pos * pos) * pos
+        self.pos[..., index] += self.dy_1[..., index] * self.stepsize
+        return self.pos[..., index]
+
+    def update_amp_5(self, index=slice(None)):
+        self.dy_1[..., index] = self.ar[..., index] * (self.R[..., index] - self.pos[..., index]) ** 3
+        self.pos[..., index] += self.dy_1[..., index] * self.stepsize
+        return self.pos[..., index]
+
+    def get_pos(self, index=slice(None)):
+        return self.pos[..., index]
+
+
+class DifferentialView:
+    """
+    one row of a DifferentialBank with the DifferentialEq interface
+    """
+    __slots__ = ("bank", "index", "_rows")
+
+    def __init__(self, bank: DifferentialBank, index: int) -> None:
+        self.bank = bank
+        self.index = index
+        self._rows = slice(index, index + 1)
+
+    def _field(name, parameter=False):
+        def set(self, value):
+            getattr(self.bank, name)[self.index] = value
+            if parameter:
+                self.bank.parameters_changed()
+        return property(lambda self: getattr(self.bank, name)[self.index], set)
+
+    R = _field("R", parameter=True)
+    pos = _field("pos")
+    dy_1 = _field("dy_1")
+    dy_2 = _field("dy_2")
+    del _field
+
+    @property
+    def ar(self):
+        return self.bank.ar[self.index]
+
+    @ar.setter
+    def ar(self, value):
+        ar = self.bank.ar.copy()
+        ar[self.index] = value
+        self.bank.ar = ar
+
+    @property
+    def stepsize(self):
+        return self.bank.stepsize
+
+    @property
+    def exact(self):
+        return self.bank.exact
+
+    def update_exact(self, kind, steps=1):
+        return self.bank.update_exact(kind, self._rows, steps)[0]
+
+    def update_amp_1(self):
+        return self.bank.update_amp_1(self._rows)[0]
+
+    def update_amp_2(self):
+        return self.bank.update_amp_2(self._rows)[0]
+
+    def update_amp_3(self):
+        return self.bank.update_amp_3(self._rows)[0]
+
+    def update_amp_4(self):
+        return self.bank.update_amp_4(self._rows)[0]
+
+    def update_amp_5(self):
+        return self.bank.update_amp_5(self._rows)[0]
+
+    def get_pos(self):
+        return self.pos
 
 
 if __name__ == "__main__":
@@ -0,0 +1,111 @@
+# ----------------------------------------------------------------
+# The University of york
+# The School of Physics, Engineering and Technology
+# Robotics and Autonomous System Lab
+# Author    : agent
+# File      : gait_cache.py
+# Date      : 18-Oct-2026
+# Version:  :
+# ----------------------------------------------------------------
+import hashlib
+import os
+from collections import OrderedDict
+import numpy as np
+from cpg_configuration import CpgConfig, CompiledGait, CouplingGraph
+from basic_cpg import BasicCpg
+from limit_cycle import LimitCycleTable, parameter_signature
+
+
+class GaitCache():
+    def __init__(self, maxsize=16, directory=None) -> None:
+        """
+        content-hashed LRU cache of compiled gaits and steady-state cycles
+        maxsize: entries kept in memory, the least recently used one is evicted first
+        directory: optional on-disk store, entries evicted from memory are reloaded from it
+        """
+        self.maxsize = maxsize
+        self.directory = directory
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def clear(self):
+        self.entries.clear()
+
+    def _get(self, key, load):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        path = self._path(key)
+        if path is not None and os.path.exists(path):
+            self.hits += 1
+            with np.load(path) as data:
+                value = load(data)
+            self._put(key, value)
+            return value
+        self.misses += 1
+        return None
+
+    def _put(self, key, value, save=None):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        path = self._path(key)
+        if save is not None and path is not None:
+            tmp = path + ".tmp.npz"
+            np.savez(tmp, **save)
+            os.replace(tmp, path)
+
+    def _path(self, key):
+        return None if self.directory is None else os.path.join(self.directory, key + ".npz")
+
+    def compile(self, cpg_config: CpgConfig) -> CompiledGait:
+        """
+        compiled artifacts of cpg_config, built only the first time its gait is seen
+        """
+        key = cpg_config.gait_key()
+        compiled = self._get(key, lambda data: _load_compiled(key, data))
+        if compiled is None:
+            compiled = cpg_config.compile()
+            compiled.phase_lag_matrix.flags.writeable = False
+            self._put(key, compiled, {"phase_lag_matrix": compiled.phase_lag_matrix,
+                                      "coupling_weights": np.asarray(cpg_config.coupling_weights, dtype=float),
+                                      "legs": compiled.legs,
+                                      "filter_transition": compiled.filter_transition})
+        return compiled
+
+    def limit_cycle(self, cpg: BasicCpg, samples=256, tolerance=1e-3, max_cycles=50) -> LimitCycleTable:
+        """
+        steady-state cycle of the current cpg parameters, see LimitCycleTable.from_cpg
+        """
+        signature = parameter_signature(cpg)
+        key = "cycle-" + hashlib.sha256(signature + repr(samples).encode()).hexdigest()
+        table = self._get(key, _load_cycle)
+        if table is None:
+            table = LimitCycleTable.from_cpg(cpg, samples, tolerance, max_cycles)
+            self._put(key, table, {"period": table.period, "theta": table.theta, "progress": table.progress,
+                                   "phi_start": table.phi_start, "filter_pos": table.filter_pos,
+                                   "signature": np.frombuffer(table.signature, dtype=np.uint8)})
+        return table
+
+
+def _load_compiled(key, data):
+    matrix = data["phase_lag_matrix"]
+    matrix.flags.writeable = False
+    return CompiledGait(key, matrix, CouplingGraph(data["coupling_weights"], matrix),
+                        data["legs"], data["filter_transition"])
+
+
+def _load_cycle(data):
+    return LimitCycleTable(float(data["period"]), data["theta"], data["progress"], data["phi_start"],
+                           data["filter_pos"], data["signature"].tobytes())
@@ -0,0 +1,152 @@
+# ----------------------------------------------------------------
+# The University of york
+# The School of Physics, Engineering and Technology
+# Robotics and Autonomous System Lab
+# Author    : agent
+# File      : integrators.py
+# Date      : 18-Oct-2026
+# Version:  :
+# ----------------------------------------------------------------
+import numpy as np
+
+
+def euler_step(f, t, y, h, k1):
+    return y + h * k1
+
+
+def rk4_step(f, t, y, h, k1):
+    k2 = f(t + h / 2, y + h / 2 * k1)
+    k3 = f(t + h / 2, y + h / 2 * k2)
+    k4 = f(t + h, y + h * k3)
+    return y + h / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+
+# fixed step methods, each takes f(t, y), t, y, h and k1 = f(t, y)
+FIXED_STEP_METHODS = {
+    "euler": euler_step,
+    "rk4": rk4_step,
+}
+
+# Dormand-Prince 5(4) tableau and its dense output polynomial
+DOPRI_C = np.array([0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1])
+DOPRI_A = [[],
+           [1 / 5],
+           [3 / 40, 9 / 40],
+           [44 / 45, -56 / 15, 32 / 9],
+           [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729],
+           [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656]]
+DOPRI_B = np.array([35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84])
+DOPRI_E = np.array([-71 / 57600, 0, 71 / 16695, -71 / 1920, 17253 / 339200, -22 / 525, 1 / 40])
+DOPRI_P = np.array([
+    [1, -8048581381 / 2820520608, 8663915743 / 2820520608, -12715105075 / 11282082432],
+    [0, 0, 0, 0],
+    [0, 131558114200 / 32700410799, -68118460800 / 10900136933, 87487479700 / 32700410799],
+    [0, -1754552775 / 470086768, 14199869525 / 1410260304, -10690763975 / 1880347072],
+    [0, 127303824393 / 49829197408, -318862633887 / 49829197408, 701980252875 / 199316789632],
+    [0, -282668133 / 205662961, 2019193451 / 616988883, -1453857185 / 822651844],
+    [0, 40617522 / 29380423, -110615467 / 29380423, 69997945 / 29380423]])
+
+
+def hermite_coefficients(y0, y1, f0, f1, h):
+    """
+    cubic Hermite interpolant on one step, in the Trajectory polynomial form
+    """
+    d = (y1 - y0) / h
+    zero = np.zeros_like(y0)
+    return np.stack([f0, 3 * d - 2 * f0 - f1, f0 + f1 - 2 * d, zero], axis=-1)
+
+
+class Trajectory():
+    def __init__(self, t, y, q, nfev) -> None:
+        """
+        piecewise polynomial solution of an ODE
+        t: (K + 1,) step times, y: (K + 1, ...) states at the step times
+        q: (K, ..., 4), inside step i y(t_i + x * h_i) = y_i + h_i * sum_m q_im * x^(m + 1)
+        nfev: number of function evaluations used
+        """
+        self.t = t
+        self.y = y
+        self.q = q
+        self.nfev = nfev
+
+    def __call__(self, t_eval):
+        """
+        dense output at the times t_eval, returns (len(t_eval), ...)
+        """
+        t_eval = np.atleast_1d(np.asarray(t_eval, dtype=float))
+        i = np.clip(np.searchsorted(self.t, t_eval, side="right") - 1, 0, len(self.q) - 1)
+        h = self.t[i + 1] - self.t[i]
+        x = (t_eval - self.t[i]) / h
+        powers = x[:, None] ** np.arange(1, 5)
+        extra = (1,) * (self.y.ndim - 1)
+        poly = np.sum(self.q[i] * powers.reshape((len(x),) + extra + (4,)), axis=-1)
+        return self.y[i] + h.reshape((len(x),) + extra) * poly
+
+
+def solve(f, t_span, y0, method="rk45", step=None, rtol=1e-6, atol=1e-8, max_step=np.inf):
+    """
+    integrate y' = f(t, y) over t_span = (t0, t1)
+    method: "euler" or "rk4" with a fixed step, or "rk45" (adaptive Dormand-Prince)
+    step: fixed step size, or the initial step of rk45
+    """
+    t0, t1 = t_span
+    y = np.array(y0, dtype=float)
+    if method in FIXED_STEP_METHODS:
+        if step is None:
+            raise ValueError("Method {} needs a fixed step size!".format(method))
+        return _solve_fixed(FIXED_STEP_METHODS[method], f, t0, t1, y, step)
+    if method == "rk45":
+        return _solve_rk45(f, t0, t1, y, step, rtol, atol, max_step)
+    raise ValueError("Unknown integration method {}!".format(method))
+
+
+def _solve_fixed(step_fun, f, t0, t1, y, h):
+    n = max(int(np.ceil((t1 - t0) / h - 1e-9)), 1)
+    t = np.linspace(t0, t1, n + 1)
+    ys = np.empty((n + 1,) + y.shape)
+    q = np.empty((n,) + y.shape + (4,))
+    ys[0] = y
+    k1 = f(t[0], y)
+    nfev = 1
+    for i in range(n):
+        h = t[i + 1] - t[i]
+        y_new = step_fun(f, t[i], y, h, k1)
+        k_new = f(t[i + 1], y_new)
+        nfev += 4 if step_fun is rk4_step else 1
+        q[i] = hermite_coefficients(y, y_new, k1, k_new, h)
+        ys[i + 1] = y = y_new
+        k1 = k_new
+    return Trajectory(t, ys, q, nfev)
+
+
+def _solve_rk45(f, t0, t1, y, h, rtol, atol, max_step):
+    k = np.empty((7,) + y.shape)
+    k[0] = f(t0, y)
+    nfev = 1
+    if h is None:
+        scale = atol + rtol * np.abs(y)
+        d0 = np.sqrt(np.mean((y / scale) ** 2))
+        d1 = np.sqrt(np.mean((k[0] / scale) ** 2))
+        h = 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01 * d0 / d1
+    t = t0
+    ts, ys, qs = [t0], [y], []
+    while t < t1:
+        h = min(h, max_step, t1 - t)
+        last = h == t1 - t
+        for s in range(1, 6):
+            dy = np.tensordot(DOPRI_A[s], k[:s], axes=1)
+            k[s] = f(t + DOPRI_C[s] * h, y + h * dy)
+        y_new = y + h * np.tensordot(DOPRI_B, k[:6], axes=1)
+        k[6] = f(t + h, y_new)
+        nfev += 6
+        scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+        err = np.sqrt(np.mean((h * np.tensordot(DOPRI_E, k, axes=1) / scale) ** 2))
+        if err <= 1:
+            qs.append(np.tensordot(k, DOPRI_P, axes=(0, 0)))
+            t, y = t1 if last else t + h, y_new
+            ts.append(t)
+            ys.append(y)
+            k[0] = k[6]
+        factor = 10 if err == 0 else min(10, max(0.2, 0.9 * err ** -0.2))
+        h *= factor
+    return Trajectory(np.array(ts), np.array(ys), np.array(qs), nfev)
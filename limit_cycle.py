@@ -0,0 +1,252 @@
+# ----------------------------------------------------------------
+# The University of york
+# The School of Physics, Engineering and Technology
+# Robotics and Autonomous System Lab
+# Author    : agent
+# File      : limit_cycle.py
+# Date      : 18-Oct-2026
+# Version:  :
+# ----------------------------------------------------------------
+import copy
+import numpy as np
+from basic_cpg import BasicCpg
+from vector_cpg import hip_gate
+
+
+def parameter_signature(cpg: BasicCpg):
+    """
+    bytes that change whenever a parameter used by BasicCpg.step changes
+    """
+    eqs = cpg.osc_bank.eqs
+    graph = cpg.coupling_graph
+    return np.concatenate([eqs.R, eqs.ar, cpg.v_stance, cpg.v_swing,
+                           np.ravel(graph.weights), np.ravel(graph.lags), [eqs.stepsize, cpg.stepsize]]).tobytes()
+
+
+def cycle_snapshot(cpg: BasicCpg):
+    """
+    state that repeats once per cycle on the limit cycle: phases relative to oscillator 0 and filter states
+    """
+    return np.concatenate([cpg.phi - cpg.phi[0], cpg.osc_bank.eqs.pos])
+
+
+class LimitCycleTable():
+    def __init__(self, period, theta, progress, phi_start, filter_pos, signature) -> None:
+        """
+        one gait cycle sampled at K points of the normalized cycle phase tau in [0, 1)
+        period: cycle duration in seconds
+        theta: (K, N) setpoints, progress: (K, N) phase advance of every oscillator since tau = 0
+        phi_start: (N,) phases at tau = 0, filter_pos: converged amplitude and offset filter states
+        signature: parameter_signature of the CPG the table was built from
+        """
+        self.period = period
+        self.theta = theta
+        self.progress = progress
+        self.phi_start = phi_start
+        self.filter_pos = filter_pos
+        self.signature = signature
+        self.samples = len(theta)
+
+    @classmethod
+    def from_cpg(cls, cpg: BasicCpg, samples=256, tolerance=1e-3, max_cycles=50):
+        """
+        integrate a copy of cpg until two consecutive cycles agree within tolerance, then record one cycle
+        cycles start when oscillator 0 crosses a multiple of 2 * pi
+        the phases are interpolated between the recorded ticks, the setpoints are rebuilt from them and the
+        converged filter states with the gate of the phases one tick earlier, as step() computes them
+        """
+        cpg = copy.deepcopy(cpg)
+        t, prev = _next_crossing(cpg)
+        for _ in range(max_cycles):
+            t, snapshot = _next_crossing(cpg)
+            if np.max(np.abs(snapshot - prev)) < tolerance:
+                break
+            prev = snapshot
+        else:
+            raise RuntimeError("CPG did not converge to a limit cycle within {} cycles!".format(max_cycles))
+
+        # record one cycle, including the ticks on both sides of the start and end crossings
+        times, phis = [0.0], [cpg.phi.copy()]
+        start = 2 * np.pi * np.floor(cpg.phi[0] / (2 * np.pi))
+        while True:
+            cpg.step()
+            times.append(times[-1] + cpg.stepsize)
+            phis.append(cpg.phi.copy())
+            if cpg.phi[0] >= start + 4 * np.pi:
+                break
+        times, phis = np.array(times), np.array(phis)
+        t0 = np.interp(start + 2 * np.pi, phis[:, 0], times)
+        t1 = np.interp(start + 4 * np.pi, phis[:, 0], times)
+        grid = t0 + (t1 - t0) * np.arange(samples) / samples
+
+        def resample(at):
+            return np.stack([np.interp(at, times, phis[:, i]) for i in range(phis.shape[1])], axis=1)
+
+        phi_table = resample(grid)
+        bank = cpg.osc_bank
+        pos = bank.eqs.pos
+        r_sw = pos[bank.sw_rows]
+        gate = hip_gate(resample(grid - cpg.stepsize))[:, cpg.legs]
+        theta = pos[bank.x_rows] + (gate * (pos[bank.st_rows] - r_sw) + r_sw) * np.cos(phi_table)
+        return cls(t1 - t0, theta, phi_table - phi_table[0], phi_table[0].copy(), pos.copy(),
+                   parameter_signature(cpg))
+
+    def lookup(self, tau, out=None):
+        """
+        setpoints at the cycle phase tau in [0, 1), linear interpolation wrapping around the cycle
+        """
+        table = self.theta
+        k = tau * self.samples
+        i = int(k)
+        f = k - i
+        j = i + 1 if i + 1 < self.samples else 0
+        if out is None:
+            out = np.empty(table.shape[1])
+        np.multiply(table[i], 1 - f, out=out)
+        out += f * table[j]
+        return out
+
+    def phase_progress(self, tau):
+        """
+        phase advance of every oscillator since tau = 0, every oscillator advances 2 * pi per cycle
+        """
+        k = tau * self.samples
+        i = int(k)
+        end = self.progress[i + 1] if i + 1 < self.samples else self.progress[0] + 2 * np.pi
+        return self.progress[i] + (k - i) * (end - self.progress[i])
+
+
+def _next_crossing(cpg: BasicCpg):
+    """
+    step until oscillator 0 crosses the next multiple of 2 * pi
+    returns the crossing time and the cycle_snapshot interpolated at the crossing
+    """
+    target = 2 * np.pi * (np.floor(cpg.phi[0] / (2 * np.pi)) + 1)
+    t = 0.0
+    while True:
+        before, phi0 = cycle_snapshot(cpg), cpg.phi[0]
+        cpg.step()
+        t += cpg.stepsize
+        if cpg.phi[0] >= target:
+            f = (target - phi0) / (cpg.phi[0] - phi0)
+            return t, before + f * (cycle_snapshot(cpg) - before)
+
+
+class LimitCycleCpg():
+    def __init__(self, cpg: BasicCpg, samples=256, tolerance=1e-3, max_cycles=50, check_every=10) -> None:
+        """
+        plays a converged gait back from a LimitCycleTable instead of integrating the CPG
+        the table is rebuilt by build(), and full integration is used whenever dt or phi_offset do not match
+        the table or cpg.parameter_version moves, which set_gait, the gait blend and the parameter setters do
+        check_every: also compare the full parameter_signature every check_every ticks, this catches in place
+                     edits of the parameter arrays (cpg.v_swing[:] = 2.0) that do not move the version,
+                     None turns the check off
+        """
+        self.cpg = cpg
+        self.samples = samples
+        self.tolerance = tolerance
+        self.max_cycles = max_cycles
+        self.check_every = check_every
+        self.table: LimitCycleTable = None
+        self.tau = 0.0
+        self.cycles = 0
+        self.theta = np.zeros(cpg.numbers)
+        self._ticks = 0
+        self._version = None        # cpg.parameter_version the table was checked against
+        self._pending: LimitCycleTable = None
+        self._wait = 0              # ticks left for the live CPG to converge onto the pending table
+
+    @property
+    def playing(self):
+        return self.table is not None
+
+    @property
+    def global_phase(self):
+        return 2 * np.pi * self.tau
+
+    def build(self, table: LimitCycleTable = None):
+        """
+        build the table from the current CPG state, or use a prebuilt one (e.g. from a GaitCache)
+        playback starts once the live state matches the table within tolerance, until then step() keeps
+        integrating the CPG (see waiting)
+        """
+        self.sync()
+        if table is None:
+            table = LimitCycleTable.from_cpg(self.cpg, self.samples, self.tolerance, self.max_cycles)
+        elif table.signature != parameter_signature(self.cpg):
+            raise ValueError("The limit cycle table was built for other CPG parameters!")
+        self._pending = table
+        self._version = self.cpg.parameter_version
+        self._wait = int(np.ceil(self.max_cycles * table.period / self.cpg.stepsize))
+        self._enter()
+        return table
+
+    @property
+    def waiting(self):
+        """
+        True while a built table waits for the live CPG to converge onto it
+        """
+        return self._pending is not None
+
+    def _enter(self):
+        """
+        start playback of the pending table if every oscillator phase and filter state is on the cycle
+        """
+        table, cpg = self._pending, self.cpg
+        # place the current state on the cycle through the phase of oscillator 0, then check the others
+        progress0 = cpg.phi[0] - table.phi_start[0]
+        cycles = int(np.floor(progress0 / (2 * np.pi)))
+        tau = float(np.interp(progress0 - 2 * np.pi * cycles,
+                              np.append(table.progress[:, 0], 2 * np.pi),
+                              np.arange(table.samples + 1) / table.samples))
+        if tau >= 1:
+            tau, cycles = 0.0, cycles + 1
+        expected = table.phi_start + table.phase_progress(tau)
+        error = np.angle(np.exp(1j * ((cpg.phi - cpg.phi[0]) - (expected - expected[0]))))
+        if max(np.max(np.abs(error)), np.max(np.abs(cpg.osc_bank.eqs.pos - table.filter_pos))) > self.tolerance:
+            return
+        self.table, self.tau, self.cycles = table, tau, cycles
+        self._pending = None
+
+    def sync(self):
+        """
+        write the playback position back into the CPG and leave playback mode
+        """
+        self._pending = None
+        table = self.table
+        if table is None:
+            return
+        cpg = self.cpg
+        cpg.phi[:] = table.phi_start + 2 * np.pi * self.cycles + table.phase_progress(self.tau)
+        cpg.osc_bank.eqs.pos[:] = table.filter_pos
+        cpg.osc_bank.offset_out[:] = table.filter_pos[cpg.osc_bank.x_rows]
+        cpg.theta[:] = self.theta
+        self.table = None
+
+    def step(self, dt=None, phi_offset=0):
+        table = self.table
+        if table is not None:
+            self._ticks += 1
+            stale = self.cpg.parameter_version != self._version or (
+                self.check_every and self._ticks % self.check_every == 0
+                and parameter_signature(self.cpg) != table.signature)
+            if (dt is not None and dt != self.cpg.stepsize) or phi_offset != 0 or stale:
+                self.sync()
+            else:
+                self.tau += self.cpg.stepsize / table.period
+                if self.tau >= 1:
+                    self.tau -= 1
+                    self.cycles += 1
+                return table.lookup(self.tau, out=self.theta)
+        self.theta[:] = self.cpg.step(dt, phi_offset)
+        if self._pending is not None:
+            self._wait -= 1
+            if self.cpg.parameter_version != self._version:
+                self._pending = None
+            elif self._wait < 0:
+                self._pending = None
+                raise RuntimeError("CPG did not converge to the limit cycle table within {} cycles!"
+                                   .format(self.max_cycles))
+            elif dt is None or dt == self.cpg.stepsize:
+                self._enter()
+        return self.theta
@@ -0,0 +1,172 @@
+# ----------------------------------------------------------------
+# The University of york
+# The School of Physics, Engineering and Technology
+# Robotics and Autonomous System Lab
+# Author    : agent
+# File      : parameter_sweep.py
+# Date      : 18-Oct-2026
+# Version:  :
+# ----------------------------------------------------------------
+import itertools
+import json
+import os
+from multiprocessing import Pool, shared_memory
+import numpy as np
+import trot_parameters as tp
+from cpg_configuration import CpgConfig
+from vector_cpg import VectorCpg, hip_gate
+
+METRICS = ("phase_lock_error", "convergence_time", "duty_factor")
+SCALAR_FIELDS = ("CW_VALUE", "CONSTANT_AR", "CONSTANT_AX", "TIME_STEP")
+VECTOR_FIELDS = ("TROT_VECTOR", "SPEED_STANCE", "SPEED_SWING", "STANCE_AMPLITUDE", "SWING_AMPLITUDE",
+                 "DESIRED_OFFSET")
+
+
+def make_config(params):
+    """
+    trot_parameters with some fields replaced, params uses the names of trot_parameters.py
+    CW_VALUE rescales COUPLING_WEIGHTS, a scalar vector field is used for every oscillator and
+    AMPLITUDE_SCALE multiplies both amplitude vectors
+    """
+    unknown = set(params) - set(SCALAR_FIELDS) - set(VECTOR_FIELDS) - {"AMPLITUDE_SCALE"}
+    if unknown:
+        raise ValueError("Unknown sweep parameters {}!".format(sorted(unknown)))
+    n = tp.OSCILLATOR_NUMBERS
+    value = {name: params.get(name, getattr(tp, name)) for name in SCALAR_FIELDS}
+    for name in VECTOR_FIELDS:
+        value[name] = list(np.broadcast_to(params.get(name, getattr(tp, name)), n))
+    scale = params.get("AMPLITUDE_SCALE", 1)
+    weights = (np.asarray(tp.COUPLING_WEIGHTS, dtype=float) * (value["CW_VALUE"] / tp.CW_VALUE)).tolist()
+    return CpgConfig("sweep", n, value["CONSTANT_AR"], value["CONSTANT_AX"], value["TIME_STEP"],
+                     weights, value["TROT_VECTOR"], value["SPEED_STANCE"], value["SPEED_SWING"],
+                     [a * scale for a in value["STANCE_AMPLITUDE"]], [a * scale for a in value["SWING_AMPLITUDE"]],
+                     value["DESIRED_OFFSET"], tp.INITIAL_AMPLITUDE, tp.INITIAL_OFFSET, tp.INITIAL_PHASE)
+
+
+def gait_metrics(cpg_config: CpgConfig, duration=10.0, lock_tolerance=0.05):
+    """
+    phase_lock_error: mean |phi_j - phi_i - phi_ij| over the coupled pairs at the end of the run (rad)
+    convergence_time: time after which the phase lock error stays within lock_tolerance of its final value (s)
+    duty_factor: stance fraction of the legs over the last second
+    """
+    cpg = VectorCpg(cpg_config)
+    steps = int(round(duration / cpg.stepsize))
+    _, phi, _ = cpg.simulate(steps)
+    graph = cpg.graph
+    lock = phi[:, graph.cols] - phi[:, graph.rows] - graph.lags
+    lock_error = np.mean(np.abs(np.angle(np.exp(1j * lock))), axis=1)
+    final = lock_error[-1]
+    unlocked = np.flatnonzero(lock_error > final + lock_tolerance)
+    convergence = 0.0 if len(unlocked) == 0 else (unlocked[-1] + 1) * cpg.stepsize
+    last_second = phi[-max(1, int(round(1 / cpg.stepsize))):]
+    duty = float(np.mean(hip_gate(last_second)))
+    return np.array([final, convergence, duty])
+
+
+def grid(**axes):
+    """
+    every combination of the given values, e.g. grid(CW_VALUE=[2, 4], CONSTANT_AR=[10, 20])
+    """
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*(axes[name] for name in names))]
+
+
+def random_samples(n, bounds, seed=None):
+    """
+    n uniform samples inside bounds = {name: (low, high)}
+    """
+    rng = np.random.default_rng(seed)
+    return [{name: float(rng.uniform(low, high)) for name, (low, high) in bounds.items()} for _ in range(n)]
+
+
+class GaussianSearch():
+    def __init__(self, bounds, population=16, elite=4, seed=None) -> None:
+        """
+        cross-entropy style search: sample a population, refit a diagonal Gaussian to the elite ones
+        bounds = {name: (low, high)}, samples are clipped to the bounds
+        """
+        self.names = list(bounds)
+        self.low = np.array([bounds[n][0] for n in self.names], dtype=float)
+        self.high = np.array([bounds[n][1] for n in self.names], dtype=float)
+        self.mean = (self.low + self.high) / 2
+        self.std = (self.high - self.low) / 4
+        self.population = population
+        self.elite = elite
+        self.rng = np.random.default_rng(seed)
+        self._asked = None
+
+    def ask(self):
+        x = np.clip(self.mean + self.std * self.rng.standard_normal((self.population, len(self.names))),
+                    self.low, self.high)
+        self._asked = x
+        return [dict(zip(self.names, map(float, row))) for row in x]
+
+    def tell(self, costs):
+        """
+        costs: one value per asked sample, lower is better
+        """
+        best = self._asked[np.argsort(costs)[:self.elite]]
+        self.mean = best.mean(axis=0)
+        self.std = np.maximum(best.std(axis=0), 1e-3 * (self.high - self.low))
+
+
+_results = None
+_shm = None      # keeps the worker attachment of the shared results alive
+
+
+def _attach(name, shape):
+    global _results, _shm
+    _shm = shared_memory.SharedMemory(name=name)
+    _results = np.ndarray(shape, dtype=float, buffer=_shm.buf)
+
+
+def _evaluate(task):
+    i, params, duration = task
+    try:
+        _results[i] = gait_metrics(make_config(params), duration)
+    except (ValueError, FloatingPointError, OverflowError):
+        _results[i] = np.inf
+    return i
+
+
+def run_sweep(samples, duration=10.0, workers=None, checkpoint=None, checkpoint_every=32):
+    """
+    evaluate gait_metrics for every sample on a process pool, returns a (len(samples), len(METRICS)) array
+    workers write straight into a shared memory array, unfinished rows are nan
+    checkpoint: .npz file saved every checkpoint_every results, an existing one for the same samples is resumed
+    """
+    shape = (len(samples), len(METRICS))
+    done = np.full(shape, np.nan)
+    if checkpoint is not None and os.path.exists(checkpoint):
+        with np.load(checkpoint) as data:
+            if json.loads(str(data["samples"])) != json.loads(json.dumps(samples)):
+                raise ValueError("Checkpoint {} belongs to other samples!".format(checkpoint))
+            done = data["results"]
+    shm = shared_memory.SharedMemory(create=True, size=max(done.nbytes, 1))
+    try:
+        results = np.ndarray(shape, dtype=float, buffer=shm.buf)
+        results[:] = done
+        todo = [(i, samples[i], duration) for i in range(len(samples)) if np.isnan(results[i]).any()]
+        with Pool(workers, initializer=_attach, initargs=(shm.name, shape)) as pool:
+            for k, _ in enumerate(pool.imap_unordered(_evaluate, todo), 1):
+                if checkpoint is not None and k % checkpoint_every == 0:
+                    _save_checkpoint(checkpoint, samples, results)
+        if checkpoint is not None:
+            _save_checkpoint(checkpoint, samples, results)
+        return results.copy()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _save_checkpoint(path, samples, results):
+    tmp = path + ".tmp.npz"
+    np.savez(tmp, samples=json.dumps(samples), results=results)
+    os.replace(tmp, path)
+
+
+if __name__ == "__main__":
+    samples = grid(CW_VALUE=[1, 2, 4, 8], CONSTANT_AR=[10, 20], SPEED_SWING=[1.0, 1.5])
+    results = run_sweep(samples, duration=5.0)
+    for params, row in zip(samples, results):
+        print(params, {m: round(float(v), 3) for m, v in zip(METRICS, row)})
@@ -7,7 +7,8 @@
 # Date      : 27-Nov-2023
 # Version:  : 
 # ----------------------------------------------------------------
-from differential_funs import DifferentialEq
+import numpy as np
+from differential_funs import DifferentialEq, DifferentialBank
 
 class oscillator():
     def __init__(self, step_size, ar, ax, R_st, R_sw, X, r_0, x_0):
@@ -24,3 +25,73 @@ class oscillator():
     def update_x(self):
         self.offset_out = self.offset.update_amp_3()
         return self.offset_out
+
+
+class OscillatorBank():
+    def __init__(self, step_size, ar, ax, R_st, R_sw, X, r_0, x_0, exact=False):
+        """
+        all oscillators of a CPG in one DifferentialBank
+        rows [0, N) stance amplitude, [N, 2N) swing amplitude, [2N, 3N) offset
+        R_st, R_sw, X, r_0, x_0: (..., N), leading axes hold a batch of CPGs
+        ar, ax, step_size: scalars or arrays broadcast against them, e.g. (B, 1) columns
+        exact: exact discretization of the amplitude and offset filters
+        """
+        shape = np.shape(R_st)
+        n = shape[-1]
+        self.numbers = n
+        self.eqs = DifferentialBank(np.concatenate([np.broadcast_to(ar, shape), np.broadcast_to(ar, shape),
+                                                    np.broadcast_to(ax, shape)], axis=-1),
+                                    np.concatenate([R_st, R_sw, X], axis=-1),
+                                    step_size,
+                                    np.concatenate([r_0, r_0, x_0], axis=-1),
+                                    exact)
+        self.st_rows = slice(0, n)
+        self.sw_rows = slice(n, 2 * n)
+        self.x_rows = slice(2 * n, 3 * n)
+        self.offset_out = np.zeros(shape)
+
+    def __len__(self):
+        return self.numbers
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.numbers:
+            raise IndexError("Oscillator {} is out of range!".format(index))
+        return OscillatorView(self, index)
+
+    def update_r(self):
+        st_pos = self.eqs.update_amp_3(self.st_rows)        # joint position in stance phase
+        sw_pos = self.eqs.update_amp_3(self.sw_rows)        # joint position in swing phase
+        return st_pos, sw_pos
+
+    def update_x(self):
+        self.offset_out[...] = self.eqs.update_amp_3(self.x_rows)
+        return self.offset_out
+
+
+class OscillatorView():
+    """
+    one oscillator of an OscillatorBank with the oscillator interface
+    """
+    __slots__ = ("bank", "index", "amp_st", "amp_sw", "offset")
+
+    def __init__(self, bank: OscillatorBank, index: int):
+        self.bank = bank
+        self.index = index
+        self.amp_st = bank.eqs[index]                       # stance phase amplitude
+        self.amp_sw = bank.eqs[bank.numbers + index]        # swing phase amplitude
+        self.offset = bank.eqs[2 * bank.numbers + index]    # offset
+
+    @property
+    def offset_out(self):
+        return self.bank.offset_out[self.index]
+
+    @offset_out.setter
+    def offset_out(self, value):
+        self.bank.offset_out[self.index] = value
+
+    def update_r(self):
+        return self.amp_st.update_amp_3(), self.amp_sw.update_amp_3()
+
+    def update_x(self):
+        self.offset_out = self.offset.update_amp_3()
+        return self.offset_out
@@ -0,0 +1,107 @@
+# ----------------------------------------------------------------
+# The University of york
+# The School of Physics, Engineering and Technology
+# Robotics and Autonomous System Lab
+# Author    : agent
+# File      : realtime_runner.py
+# Date      : 18-Oct-2026
+# Version:  :
+# ----------------------------------------------------------------
+import time
+from basic_cpg import BasicCpg
+from cpg_profiler import LatencyHistogram
+
+CATCH_UP_POLICIES = ("skip", "multistep")
+
+
+class RealTimeRunner():
+    def __init__(self, cpg: BasicCpg, period=None, catch_up="skip", callback=None,
+                 spin=0.0005, clock=time.perf_counter) -> None:
+        """
+        paces cpg.step() on a monotonic clock, neither the runner nor the tick (NumPy or numba) allocates arrays
+        period: tick period in seconds, the cpg time step by default
+        catch_up: "skip" drops the ticks whose slot has passed,
+                  "multistep" runs them back to back to keep the CPG time in line with the wall clock
+        callback: called with theta after every tick, e.g. to send the setpoints to the motors
+        spin: the last part of every wait is a busy wait of this length, for a precise wake-up
+        """
+        if catch_up not in CATCH_UP_POLICIES:
+            raise ValueError("Unknown catch up policy {}, expected one of {}!".format(catch_up, CATCH_UP_POLICIES))
+        self.cpg = cpg
+        self.period = cpg.stepsize if period is None else period
+        self.catch_up = catch_up
+        self.callback = callback
+        self.spin = spin
+        self.clock = clock
+        self.phi_offset = 0
+
+        self.compute = LatencyHistogram()       # step() and callback duration
+        self.jitter = LatencyHistogram()        # wake-up time minus deadline
+        self.ticks = 0
+        self.deadline_misses = 0                # ticks that ended after the next deadline
+        self.skipped_ticks = 0
+        self.catch_up_steps = 0
+        self._running = False
+
+    def stop(self):
+        self._running = False
+
+    def run(self, n_ticks=None):
+        """
+        run n_ticks ticks, or until stop() is called (e.g. from the callback)
+        """
+        period = self.period
+        clock = self.clock
+        cpg = self.cpg
+        self._running = True
+        deadline = clock()
+        k = 0
+        while self._running and (n_ticks is None or k < n_ticks):
+            remaining = deadline - clock()
+            if remaining > self.spin:
+                time.sleep(remaining - self.spin)
+            while clock() < deadline:
+                pass
+            wake = clock()
+            self.jitter.add(wake - deadline)
+
+            theta = cpg.step(phi_offset=self.phi_offset)
+            if self.callback is not None:
+                self.callback(theta)
+            done = clock()
+            self.compute.add(done - wake)
+            self.ticks += 1
+            k += 1
+
+            deadline += period
+            if done > deadline:
+                self.deadline_misses += 1
+                missed = int((done - deadline) // period)
+                if missed:
+                    if self.catch_up == "multistep":
+                        for _ in range(missed):
+                            cpg.step(phi_offset=self.phi_offset)
+                        self.catch_up_steps += missed
+                    else:
+                        self.skipped_ticks += missed
+                    deadline += missed * period
+        self._running = False
+        return self.report()
+
+    def report(self):
+        return {"period_us": self.period * 1e6,
+                "ticks": self.ticks,
+                "deadline_misses": self.deadline_misses,
+                "skipped_ticks": self.skipped_ticks,
+                "catch_up_steps": self.catch_up_steps,
+                "compute": self.compute.summary(),
+                "jitter": self.jitter.summary()}
+
+
+if __name__ == "__main__":
+    from trot_parameters import trot_parameters
+    for rate in (60, 500, 1000):
+        runner = RealTimeRunner(BasicCpg(trot_parameters), period=1 / rate)
+        report = runner.run(rate * 2)
+        print("{:>5} Hz: misses {:>4}, compute p99 {:>6.0f} us, jitter p99 {:>6.0f} us".format(
+            rate, report["deadline_misses"], report["compute"]["p99_us"], report["jitter"]["p99_us"]))
@@ -0,0 +1,243 @@
+# ----------------------------------------------------------------
+# The University of york
+# The School of Physics, Engineering and Technology
+# Robotics and Autonomous System Lab
+# Author    : agent
+# File      : setpoint_server.py
+# Date      : 18-Oct-2026
+# Version:  :
+# ----------------------------------------------------------------
+# Setpoint service: runs the CPG on an asyncio loop and publishes theta every tick.
+#   server -> client  binary frames, little endian: uint64 sequence number, float64 timestamp
+#                     (time.monotonic() of the server), then one float32 per oscillator
+#   client -> server  one JSON command per line, applied before the next tick:
+#                     {"phi_offset": 0.3}
+#                     {"gait": "trot" or CpgConfig.to_dict(), "blend_time": 0.5}
+#                     {"speed_stance": 1.2, "speed_swing": [..], "blend_time": 0.5}
+import asyncio
+import json
+import struct
+import time
+import numpy as np
+from basic_cpg import BasicCpg
+from cpg_configuration import CpgConfig
+from gait_cache import GaitCache
+from cpg_profiler import LatencyHistogram
+
+SPEED_FIELDS = {"speed_stance": "SPEED_STANCE", "speed_swing": "SPEED_SWING"}
+
+
+def frame_format(numbers=16):
+    return struct.Struct("<Qd{}f".format(numbers))
+
+
+class SetpointServer():
+    def __init__(self, cpg: BasicCpg, host="127.0.0.1", port=0, path=None, period=None,
+                 gaits=None, max_queued_frames=8) -> None:
+        """
+        publishes cpg.step() to every connected client over TCP, or over a unix socket if path is given
+        port: 0 picks a free port, see self.port after start()
+        period: tick period in seconds, the cpg time step by default
+        gaits: {name: CpgConfig} that gait commands may refer to by name
+        max_queued_frames: a client that falls further behind misses frames instead of slowing the loop
+        """
+        self.cpg = cpg
+        self.host = host
+        self.port = port
+        self.path = path
+        self.period = cpg.stepsize if period is None else period
+        self.gaits = dict(gaits or {})
+        self.frame = frame_format(cpg.numbers)
+        self.max_buffer = max_queued_frames * self.frame.size
+        self.cache = GaitCache()
+        self.phi_offset = 0
+        self.seq = 0
+        self.dropped = 0        # frames not sent to a slow client
+        self.rejected = []      # (command, error) of the commands that could not be applied
+        self.clients = set()
+        self._commands = []
+        self._server = None
+        self._running = False
+
+    async def start(self):
+        if self.path is not None:
+            self._server = await asyncio.start_unix_server(self._serve, self.path)
+        else:
+            self._server = await asyncio.start_server(self._serve, self.host, self.port)
+            self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        self.stop()
+        for writer in list(self.clients):
+            writer.close()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def stop(self):
+        self._running = False
+
+    async def _serve(self, reader, writer):
+        self.clients.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    self.submit(json.loads(line))
+                except ValueError as e:
+                    self.rejected.append((line, str(e)))
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+    def submit(self, command):
+        """
+        queue a command, it is applied at the next tick boundary
+        """
+        if not isinstance(command, dict):
+            raise ValueError("A command must be a JSON object, got {}!".format(command))
+        self._commands.append(command)
+
+    def apply(self, command):
+        blend_time = command.get("blend_time", 0)
+        if "phi_offset" in command:
+            self.phi_offset = float(command["phi_offset"])
+        if "gait" in command:
+            gait = command["gait"]
+            config = self.gaits[gait] if isinstance(gait, str) else CpgConfig.from_dict(gait, self.cache)
+            self.cpg.set_gait(config, blend_time)
+        speeds = {SPEED_FIELDS[k]: v for k, v in command.items() if k in SPEED_FIELDS}
+        if speeds:
+            values = self.cpg.config.to_dict()
+            for name, value in speeds.items():
+                values[name] = np.broadcast_to(np.asarray(value, dtype=float), self.cpg.numbers).tolist()
+            self.cpg.set_gait(CpgConfig.from_dict(values, self.cache), blend_time)
+
+    def _apply_commands(self):
+        commands, self._commands = self._commands, []
+        for command in commands:
+            try:
+                self.apply(command)
+            except (KeyError, TypeError, ValueError) as e:
+                self.rejected.append((command, repr(e)))
+
+    def publish(self, theta):
+        data = self.frame.pack(self.seq, time.monotonic(), *theta)
+        self.seq += 1
+        for writer in list(self.clients):
+            if writer.is_closing():
+                self.clients.discard(writer)
+            elif writer.transport.get_write_buffer_size() > self.max_buffer:
+                self.dropped += 1
+            else:
+                writer.write(data)
+
+    async def run(self, n_ticks=None):
+        """
+        tick loop, ticks whose slot has passed are skipped like RealTimeRunner(catch_up="skip")
+        n_ticks: number of ticks, None to run until stop()
+        """
+        loop = asyncio.get_running_loop()
+        self._running = True
+        deadline = loop.time()
+        k = 0
+        while self._running and (n_ticks is None or k < n_ticks):
+            self._apply_commands()
+            self.publish(self.cpg.step(phi_offset=self.phi_offset))
+            k += 1
+            deadline += self.period
+            now = loop.time()
+            if now > deadline:
+                deadline += (now - deadline) // self.period * self.period
+            await asyncio.sleep(max(deadline - now, 0))
+        self._running = False
+        return k
+
+
+class FakeRobot():
+    def __init__(self, numbers=16) -> None:
+        """
+        loopback client standing in for the motor controller, records what a robot would receive
+        """
+        self.frame = frame_format(numbers)
+        self.latency = LatencyHistogram(bin_us=10)
+        self.theta = np.zeros(numbers)
+        self.received = 0
+        self.missed = 0         # gaps in the sequence numbers
+        self.last_seq = None
+        self.first_time = None
+        self.last_time = None
+        self._reader = None
+        self._writer = None
+
+    async def connect(self, host="127.0.0.1", port=None, path=None):
+        if path is not None:
+            self._reader, self._writer = await asyncio.open_unix_connection(path)
+        else:
+            self._reader, self._writer = await asyncio.open_connection(host, port)
+        return self
+
+    async def send(self, **command):
+        self._writer.write(json.dumps(command).encode() + b"\n")
+        await self._writer.drain()
+
+    async def receive(self, n_frames=None):
+        """
+        read frames until the server closes the connection or n_frames were read
+        """
+        k = 0
+        while n_frames is None or k < n_frames:
+            try:
+                data = await self._reader.readexactly(self.frame.size)
+            except asyncio.IncompleteReadError:
+                break
+            now = time.monotonic()
+            seq, stamp, *theta = self.frame.unpack(data)
+            self.latency.add(now - stamp)
+            self.theta[:] = theta
+            if self.last_seq is not None and seq > self.last_seq + 1:
+                self.missed += seq - self.last_seq - 1
+            self.last_seq = seq
+            self.first_time = now if self.first_time is None else self.first_time
+            self.last_time = now
+            self.received += 1
+            k += 1
+        return k
+
+    def report(self):
+        elapsed = (self.last_time - self.first_time) if self.received > 1 else 0.0
+        report = {"received": self.received, "missed": self.missed,
+                  "frames_per_s": (self.received - 1) / elapsed if elapsed else 0.0}
+        report.update(self.latency.summary())
+        return report
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+
+
+async def demo(seconds=2.0):
+    from trot_parameters import trot_parameters
+    server = await SetpointServer(BasicCpg(trot_parameters), gaits={"trot": trot_parameters}).start()
+    robot = await FakeRobot(server.cpg.numbers).connect(port=server.port)
+    ticks = asyncio.ensure_future(server.run(int(seconds / server.period)))
+    frames = asyncio.ensure_future(robot.receive())
+    await asyncio.sleep(seconds / 2)
+    await robot.send(phi_offset=0.3)
+    await robot.send(speed_stance=1.2, blend_time=0.5)
+    await ticks
+    await server.close()
+    await frames
+    await robot.close()
+    print("ticks {}, dropped {}, rejected {}".format(server.seq, server.dropped, server.rejected))
+    print(robot.report())
+
+
+if __name__ == "__main__":
+    asyncio.run(demo())
@@ -0,0 +1,96 @@
+# ----------------------------------------------------------------
+# The University of york
+# The School of Physics, Engineering and Technology
+# Robotics and Autonomous System Lab
+# Author    : agent
+# File      : test_cpg.py
+# Date      : 18-Oct-2026
+# Version:  :
+# ----------------------------------------------------------------
+import asyncio
+import numpy as np
+from trot_parameters import trot_parameters
+from cpg_configuration import CpgConfig
+from basic_cpg import BasicCpg
+from vector_cpg import VectorCpg
+from batch_cpg import BatchCpg
+from cpg_kernels import KernelBackend
+from setpoint_server import SetpointServer, FakeRobot
+
+
+def pace_parameters():
+    """
+    trot with the pace phase vector and other speeds, a second gait for the batch checks
+    """
+    values = trot_parameters.to_dict()
+    values["NAME"] = "pace"
+    values["PHASE_VECTOR"] = [0, 0, 0, 0, -np.pi / 2, -np.pi / 2, np.pi / 2, np.pi / 2,
+                              -np.pi, -np.pi, 0, 0, -np.pi / 2, -np.pi / 2, np.pi / 2, np.pi / 2]
+    values["SPEED_STANCE"] = [1.2] * 16
+    values["SPEED_SWING"] = [0.8] * 16
+    return CpgConfig.from_dict(values)
+
+
+def test_step_matches_legacy_updates():
+    legacy = BasicCpg(trot_parameters, backend="numpy")
+    cpg = BasicCpg(trot_parameters, backend="numpy")
+    for k in range(600):
+        phi_offset = 0.2 if k >= 300 else 0
+        legacy.update_x()
+        legacy.update_r(phi_offset)
+        legacy.update_phi(phi_offset)
+        expected = np.array(legacy.update_setpoints(), dtype=float)
+        np.testing.assert_allclose(cpg.step(phi_offset=phi_offset), expected, rtol=0, atol=1e-12)
+
+
+def test_kernel_matches_numpy():
+    for exact_filters in (False, True):
+        reference = BasicCpg(trot_parameters, exact_filters, backend="numpy")
+        kernel = KernelBackend(BasicCpg(trot_parameters, exact_filters, backend="numpy"), compiled=False)
+        for k in range(400):
+            phi_offset = 0.1 if k >= 200 else 0
+            np.testing.assert_allclose(kernel.step(phi_offset), reference.step(phi_offset=phi_offset),
+                                       rtol=0, atol=1e-12)
+
+
+def test_batch_matches_single_cpgs():
+    configs = [trot_parameters, pace_parameters()]
+    for exact_filters in (False, True):
+        theta_b, phi_b, r_b = BatchCpg(configs, exact_filters).simulate(300, 0.1)
+        for i, config in enumerate(configs):
+            theta, phi, r = VectorCpg(config, exact_filters).simulate(300, 0.1)
+            np.testing.assert_allclose(theta_b[i], theta, rtol=0, atol=1e-12)
+            np.testing.assert_allclose(phi_b[i], phi, rtol=0, atol=1e-12)
+            np.testing.assert_allclose(r_b[i], r, rtol=0, atol=1e-12)
+
+
+async def _loopback(n_ticks, phi_offset):
+    server = await SetpointServer(BasicCpg(trot_parameters, backend="numpy"), period=0.001).start()
+    robot = await FakeRobot(server.cpg.numbers).connect(port=server.port)
+    await robot.send(phi_offset=phi_offset)
+    # let the server register the client and queue the command before the first tick
+    while not server.clients or not server._commands:
+        await asyncio.sleep(0.001)
+    await server.run(n_ticks)
+    await server.close()
+    await robot.receive()
+    await robot.close()
+    return server, robot
+
+
+def test_fake_robot_loopback():
+    server, robot = asyncio.run(_loopback(50, 0.3))
+    assert robot.received == 50 and robot.missed == 0 and server.dropped == 0
+    assert server.rejected == []
+    reference = BasicCpg(trot_parameters, backend="numpy")
+    for _ in range(50):
+        theta = reference.step(phi_offset=0.3)
+    # frames carry float32 setpoints
+    np.testing.assert_allclose(robot.theta, theta, rtol=0, atol=1e-6)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(name, "ok")
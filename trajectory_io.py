@@ -0,0 +1,119 @@
+# ----------------------------------------------------------------
+# The University of york
+# The School of Physics, Engineering and Technology
+# Robotics and Autonomous System Lab
+# Author    : agent
+# File      : trajectory_io.py
+# Date      : 18-Oct-2026
+# Version:  :
+# ----------------------------------------------------------------
+# Trajectory file layout:
+#   8 bytes   magic b"CPGTRAJ1"
+#   8 bytes   little endian uint64, length of the JSON header
+#   header    JSON (fields, numbers, dtype, time_step, CpgConfig.to_dict()), space padded to 64 bytes
+#   records   one (fields, numbers) array per tick in C order, appended until the file is closed
+# The number of ticks follows from the file size, so a file cut short by a crash is still readable.
+import json
+import struct
+import numpy as np
+from cpg_configuration import CpgConfig
+
+MAGIC = b"CPGTRAJ1"
+ALIGNMENT = 64
+
+
+class TrajectoryWriter():
+    def __init__(self, path, cpg_config: CpgConfig, fields=("theta", "phi", "r", "offset"),
+                 dtype="float32", chunk_ticks=1024) -> None:
+        """
+        streams ticks to path through a preallocated chunk of chunk_ticks ticks
+        usable as the recorder of BasicCpg.stream
+        """
+        self.fields = tuple(fields)
+        self.numbers = cpg_config.oscillator_number
+        self.dtype = np.dtype(dtype)
+        self.chunk = np.zeros((chunk_ticks, len(self.fields), self.numbers), dtype=self.dtype)
+        self.count = 0
+        self._fill = 0
+        header = json.dumps({"fields": self.fields, "numbers": self.numbers, "dtype": self.dtype.str,
+                             "time_step": cpg_config.time_step, "config": cpg_config.to_dict()}).encode()
+        pad = -(len(MAGIC) + 8 + len(header)) % ALIGNMENT
+        self._file = open(path, "wb")
+        self._file.write(MAGIC + struct.pack("<Q", len(header) + pad) + header + b" " * pad)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record(self, **values):
+        """
+        append one tick, every field must be given, other values are ignored
+        """
+        row = self.chunk[self._fill]
+        for k, f in enumerate(self.fields):
+            row[k] = values[f]
+        self._fill += 1
+        self.count += 1
+        if self._fill == len(self.chunk):
+            self.flush()
+
+    def flush(self):
+        if self._fill:
+            self._file.write(self.chunk[:self._fill].tobytes())
+            self._fill = 0
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+class TrajectoryReader():
+    def __init__(self, path) -> None:
+        """
+        memory maps a trajectory file, slices of data are zero-copy views of the file
+        """
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError("{} is not a CPG trajectory file!".format(path))
+            (length,) = struct.unpack("<Q", f.read(8))
+            self.header = json.loads(f.read(length))
+        self.fields = tuple(self.header["fields"])
+        self.numbers = self.header["numbers"]
+        self.time_step = self.header["time_step"]
+        offset = len(MAGIC) + 8 + length
+        dtype = np.dtype(self.header["dtype"])
+        record = len(self.fields) * self.numbers * dtype.itemsize
+        raw = np.memmap(path, dtype=np.uint8, mode="r", offset=offset)
+        ticks = len(raw) // record
+        self.data = raw[:ticks * record].view(dtype).reshape(ticks, len(self.fields), self.numbers)
+
+    def __len__(self):
+        return len(self.data)
+
+    def config(self, cache=None) -> CpgConfig:
+        return CpgConfig.from_dict(self.header["config"], cache)
+
+    def time(self, start=0, stop=None):
+        """
+        time of the ticks in [start, stop), the first recorded tick is one time step after the start
+        """
+        stop = len(self) if stop is None else stop
+        return (np.arange(start, stop) + 1) * self.time_step
+
+    def field(self, name, start=None, stop=None, joints=slice(None)):
+        """
+        (ticks, joints) view of one field over the ticks [start, stop)
+        """
+        return self.data[start:stop, self.fields.index(name), joints]
+
+    def window(self, name, t0, t1, joints=slice(None)):
+        """
+        view of one field between the times t0 and t1 in seconds
+        """
+        start = max(int(np.ceil(t0 / self.time_step)) - 1, 0)
+        stop = max(int(np.floor(t1 / self.time_step)), start)
+        return self.field(name, start, stop, joints)
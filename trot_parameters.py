@@ -53,7 +53,7 @@ COUPLING_WEIGHTS = [[0, CW_VALUE, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],  #
                     [0, 0, 0, 0, CW_VALUE, 0, 0, 0, 0, CW_VALUE, CW_VALUE, 0, CW_VALUE, 0, 0, 0],  # RF hip
                     [0, 0, 0, 0, 0, CW_VALUE, 0, 0, CW_VALUE, 0, 0, CW_VALUE, 0, CW_VALUE, 0, 0],  # RR hip
                     [0, 0, 0, 0, 0, 0, CW_VALUE, 0, CW_VALUE, 0, 0, CW_VALUE, 0, 0, CW_VALUE, 0],  # LF hip
-                    [0, 0, 0, 0, 0, 0, 0, CW_VALUE, 0, CW_VALUE, CW_VALUE, CW_VALUE, 0, 0, 0, 0, CW_VALUE],  # LR hip
+                    [0, 0, 0, 0, 0, 0, 0, CW_VALUE, 0, CW_VALUE, CW_VALUE, CW_VALUE, 0, 0, 0, 0],  # LR hip
                     [0, 0, 0, 0, 0, 0, 0, 0, CW_VALUE, 0, 0, 0, 0, CW_VALUE, CW_VALUE, 0],  # RF knee
                     [0, 0, 0, 0, 0, 0, 0, 0, 0, CW_VALUE, 0, 0, CW_VALUE, 0, 0, CW_VALUE],  # RR knee
                     [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, CW_VALUE, 0, CW_VALUE, 0, 0, CW_VALUE],  # LF knee
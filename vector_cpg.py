@@ -0,0 +1,341 @@
+# ----------------------------------------------------------------
+# The University of york
+# The School of Physics, Engineering and Technology
+# Robotics and Autonomous System Lab
+# Author    : agent
+# File      : vector_cpg.py
+# Date      : 18-Oct-2026
+# Version:  :
+# ----------------------------------------------------------------
+import numpy as np
+from cpg_configuration import CpgConfig, leg_index_map
+from phase_oscillator import OscillatorBank
+from cpg_profiler import CpgProfiler
+from integrators import solve, Trajectory
+from contextlib import contextmanager
+from typing import Optional
+
+
+def hip_gate(phi, phi_offset=0):
+    """
+    vectorized BasicCpg.hip_feedback
+    phi: (..., N) phases, returns (..., 4) with 1 for stance and 0 for swing
+    """
+    n = phi.shape[-1]
+    new_phi = phi[..., n - 8:n - 4] + phi_offset
+    first_v = -np.sin(new_phi)
+    second_v = -np.cos(new_phi)
+    return np.where(first_v == 0, second_v <= 0, first_v < 0).astype(float)
+
+
+def _filter_rows(field, rows):
+    """
+    property viewing one row block of the OscillatorBank, field "R" for the targets or "pos" for the states
+    """
+    def get(self):
+        return getattr(self.osc_bank.eqs, field)[..., getattr(self.osc_bank, rows)]
+
+    def set(self, value):
+        get(self)[...] = value
+        if field == "R":
+            self.parameters_changed()
+    return property(get, set)
+
+
+class VectorCpg():
+    def __init__(self, cpg_config: CpgConfig, exact_filters=False) -> None:
+        """
+        NumPy engine of the CPG, the whole network is held as arrays, BasicCpg.step runs through it
+        cpg_config: cpg parameters settings
+        exact_filters: integrate the amplitude and offset filters exactly instead of forward Euler
+        """
+
+        self.name = getattr(cpg_config, "name")
+        self.config = cpg_config
+        self.numbers = cpg_config.oscillator_number
+        self.stepsize = cpg_config.time_step
+        self.ar = cpg_config.ar
+        self.ax = cpg_config.ax
+        self._build(cpg_config.speed_stance, cpg_config.speed_swing,
+                    cpg_config.st_amplitude, cpg_config.sw_amplitude, cpg_config.desired_offset,
+                    cpg_config.initial_amplitude, cpg_config.initial_offset, cpg_config.initial_phase,
+                    exact_filters)
+
+        self.coupling_w = np.array(cpg_config.coupling_weights, dtype=float)
+        self.coupling_phi = np.asarray(cpg_config.phase_lag_matrix, dtype=float)
+        self.graph = cpg_config.coupling_graph
+        self.phase_vec = cpg_config.phase_lag_vector
+        self.legs = cpg_config.compiled.legs
+
+    def _build(self, v_stance, v_swing, amp_st, amp_sw, desired_offset, initial_amplitude, initial_offset,
+               initial_phase, exact_filters):
+        """
+        parameter and state arrays, (N,) or (B, N) for a batch, stepsize, ar and ax are set before
+        amplitude and offset filters live in one OscillatorBank, rows [stance, swing, offset]
+        """
+        self._v_stance = np.array(v_stance, dtype=float)
+        self._v_swing = np.array(v_swing, dtype=float)
+        self.osc_bank = OscillatorBank(self.stepsize, self.ar, self.ax, amp_st, amp_sw, desired_offset,
+                                       initial_amplitude, initial_offset, exact_filters)
+        self.phi = np.array(initial_phase, dtype=float)
+
+        # outputs
+        self.amp_out = np.zeros(self.phi.shape)
+        self.offset_out = self.osc_bank.offset_out
+        self.theta = np.zeros(self.phi.shape)
+        self.exact_filters = exact_filters
+        self.profiler: Optional[CpgProfiler] = None     # set by profile(), None costs one check per stage
+        self._parameter_version = 0
+
+        # work buffers of step(), which allocates no arrays
+        hips = self.phi.shape[:-1] + (4,)
+        self._hip_work = np.empty(hips), np.empty(hips), np.empty(hips), np.empty(hips, bool), np.empty(hips, bool)
+        self._gate_buf = np.empty(self.phi.shape)
+        self._rate_buf = np.empty(self.phi.shape)
+        self._coupling_buf = np.empty(self.phi.shape)
+        self._coupling_work = (None, None)      # (graph, graph.workspace())
+
+    @property
+    def parameter_version(self):
+        """
+        moves whenever a parameter used by step() changes through a setter, set_gait, a gait blend tick,
+        an oscillator view (cpg.osc[8].amp_sw.R = 0.5) or parameters_changed()
+        """
+        return self._parameter_version + self.osc_bank.eqs.version
+
+    def parameters_changed(self):
+        """
+        bump parameter_version, call it after editing a parameter array in place, e.g. cpg.v_stance[3] = 1.2
+        """
+        self._parameter_version += 1
+
+    # speeds are read by every tick from these arrays, assigning to them writes in place
+    @property
+    def v_stance(self):
+        return self._v_stance
+
+    @v_stance.setter
+    def v_stance(self, value):
+        self._v_stance[...] = value
+        self.parameters_changed()
+
+    @property
+    def v_swing(self):
+        return self._v_swing
+
+    @v_swing.setter
+    def v_swing(self, value):
+        self._v_swing[...] = value
+        self.parameters_changed()
+
+    # amplitude and offset targets and states are views of the filter bank
+    amp_st = _filter_rows("R", "st_rows")
+    amp_sw = _filter_rows("R", "sw_rows")
+    desired_offset = _filter_rows("R", "x_rows")
+    r_st = _filter_rows("pos", "st_rows")
+    r_sw = _filter_rows("pos", "sw_rows")
+    x = _filter_rows("pos", "x_rows")
+
+    def set_exact_filters(self, exact_filters):
+        """
+        switch the amplitude and offset filters between forward Euler and the exact discretization
+        """
+        self.exact_filters = exact_filters
+        self.osc_bank.eqs.exact = exact_filters
+        self.parameters_changed()
+
+    # stages of one tick, shared by step(), the update_* methods and derivative()
+    # step() passes its work buffers as out, the other callers get new arrays
+    def _gate(self, phi, phi_offset=0, out=None):
+        if out is None:
+            return hip_gate(phi, phi_offset)[..., self.legs]
+        hips, sin, cos, zero, stance = self._hip_work
+        n = self.numbers
+        np.add(phi[..., n - 8:n - 4], phi_offset, out=hips)
+        np.sin(hips, out=sin)
+        np.cos(hips, out=cos)
+        np.equal(sin, 0, out=zero)
+        np.greater_equal(cos, 0, out=stance)
+        np.greater(sin, 0, out=hips)            # hips now holds the gate of every leg, same rule as hip_gate
+        np.copyto(hips, stance, where=zero)
+        return np.take(hips, self.legs, axis=-1, out=out, mode="clip")
+
+    def _phase_rate(self, phi, gate, out=None):
+        """
+        dphi/dt of every oscillator, stance or swing speed plus the coupling
+        """
+        if out is None:
+            out = np.empty(phi.shape)
+            coupling = self.graph.coupling_sum(phi)
+        else:
+            graph, work = self._coupling_work
+            if graph is not self.graph:
+                graph, work = self._coupling_work = (self.graph, self.graph.workspace(phi.shape[:-1]))
+            coupling = graph.coupling_sum(phi, self._coupling_buf, work)
+        np.subtract(self._v_stance, self._v_swing, out=out)
+        out *= gate
+        out += self._v_swing
+        out *= 2 * np.pi
+        out += coupling
+        return out
+
+    def _filter_outputs(self, gate):
+        bank = self.osc_bank
+        pos = bank.eqs.pos
+        r_sw = pos[..., bank.sw_rows]
+        np.subtract(pos[..., bank.st_rows], r_sw, out=self.amp_out)
+        self.amp_out *= gate
+        self.amp_out += r_sw
+        self.offset_out[...] = pos[..., bank.x_rows]
+
+    def _update_setpoints(self):
+        np.cos(self.phi, out=self.theta)
+        self.theta *= self.amp_out
+        self.theta += self.offset_out
+        return self.theta
+
+    def update_x(self):
+        self.osc_bank.update_x()
+        return True
+
+    def update_r(self, phi_offset=0):
+        gate = self._gate(self.phi, phi_offset)
+        r_st, r_sw = self.osc_bank.update_r()
+        self.amp_out[...] = gate * (r_st - r_sw) + r_sw
+        return True
+
+    def update_phi(self, phi_offset=0):
+        """
+        before update phi, the "r" and "x" should be updated firstly
+        """
+        self.phi += self._phase_rate(self.phi, self._gate(self.phi, phi_offset)) * self.stepsize
+        return self.phi
+
+    def update_setpoints(self):
+        """
+        before update setpoints, we should update phi firstly
+        """
+        return self._update_setpoints()
+
+    def step(self, dt=None, phi_offset=0):
+        """
+        one fused tick, same as update_x, update_r, update_phi and update_setpoints in order
+        the hip feedback is evaluated once and shared by the amplitude and phase updates,
+        all stages write into preallocated buffers, a tick of a single CPG allocates no arrays
+        dt: step size of this tick, the configured time step by default
+        """
+        prof = self.profiler
+        if prof is not None:
+            start = t = prof.clock()
+        eqs = self.osc_bank.eqs
+        if dt is None:
+            dt = self.stepsize
+        swap = dt is not self.stepsize and np.any(dt != eqs.stepsize)
+        if swap:
+            eqs.stepsize = dt
+        gate = self._gate(self.phi, phi_offset, self._gate_buf)
+        if prof is not None:
+            t = prof.lap("hip_feedback", t)
+        eqs.update_amp_3()        # stance, swing and offset filters in one pass
+        self._filter_outputs(gate)
+        if prof is not None:
+            t = prof.lap("filters", t)
+        rate = self._phase_rate(self.phi, gate, self._rate_buf)
+        rate *= dt
+        self.phi += rate
+        if prof is not None:
+            t = prof.lap("update_phi", t)
+        self._update_setpoints()
+        if swap:
+            eqs.stepsize = self.stepsize
+        if prof is not None:
+            prof.lap("update_setpoints", t)
+            prof.lap("tick", start)
+            self._check_profiler()
+        return self.theta
+
+    def _check_profiler(self):
+        if self.profiler.done:
+            self.profiler = None
+
+    @contextmanager
+    def profile(self, n_ticks=None, profiler: Optional[CpgProfiler] = None):
+        """
+        profile the ticks of step() run inside the with block, at most n_ticks of them
+        with cpg.profile(600) as prof: ...  then prof.to_dict() or prof.prometheus()
+        profiler: an existing CpgProfiler to add to, a new one by default
+        """
+        if profiler is None:
+            profiler = CpgProfiler(n_ticks=n_ticks)
+        elif n_ticks is not None:
+            profiler.n_ticks = profiler.ticks + n_ticks
+        self.profiler = profiler
+        try:
+            yield profiler
+        finally:
+            if self.profiler is profiler:
+                self.profiler = None
+
+    def simulate(self, n_steps, phi_offset=0):
+        """
+        run n_steps ticks and record theta, phi and r (amp_out)
+        returns three arrays of shape (..., n_steps, N)
+        """
+        shape = self.phi.shape[:-1] + (n_steps, self.numbers)
+        theta_s = np.empty(shape)
+        phi_s = np.empty(shape)
+        r_s = np.empty(shape)
+        for k in range(n_steps):
+            theta_s[..., k, :] = self.step(phi_offset=phi_offset)
+            phi_s[..., k, :] = self.phi
+            r_s[..., k, :] = self.amp_out
+        return theta_s, phi_s, r_s
+
+    # continuous time view of the network for the integrators module
+    # the state vector stacks [phi, r_st, r_sw, x] along the last axis, the filter part is the bank state
+    def get_state(self):
+        return np.concatenate([self.phi, self.osc_bank.eqs.pos], axis=-1)
+
+    def set_state(self, y):
+        y = np.asarray(y, dtype=float)
+        self.phi[...] = y[..., :self.numbers]
+        self.osc_bank.eqs.pos[...] = y[..., self.numbers:]
+
+    def derivative(self, t, y, phi_offset=0):
+        """
+        f(t, y) of the whole CPG
+        """
+        phi, filters = y[..., :self.numbers], y[..., self.numbers:]
+        eqs = self.osc_bank.eqs
+        return np.concatenate([self._phase_rate(phi, self._gate(phi, phi_offset)),
+                               eqs.ar * (eqs.R - filters)], axis=-1)
+
+    def setpoints(self, y, phi_offset=0):
+        """
+        theta of one or more stacked states, e.g. samples of a Trajectory
+        """
+        phi, r_st, r_sw, x = np.split(y, 4, axis=-1)
+        return x + (self._gate(phi, phi_offset) * (r_st - r_sw) + r_sw) * np.cos(phi)
+
+    def integrate(self, duration, method="rk45", step=None, phi_offset=0, **options) -> Trajectory:
+        """
+        integrate the CPG ODE from the current state over duration seconds
+        method: "euler", "rk4" or "rk45", see integrators.solve
+        the state is left at the end of the trajectory, resample it with
+        traj(np.arange(0, duration, time_step)) and setpoints()
+        """
+        traj = solve(lambda t, y: self.derivative(t, y, phi_offset), (0, duration),
+                     self.get_state(), method, step, **options)
+        self.set_state(traj.y[-1])
+        self._sync_outputs(phi_offset)
+        return traj
+
+    def _sync_outputs(self, phi_offset=0):
+        self._filter_outputs(self._gate(self.phi, phi_offset))
+        return self._update_setpoints()
+
+    def get_curr_amp(self, osc_num):
+        return np.take(self.r_st, osc_num, axis=-1), np.take(self.r_sw, osc_num, axis=-1)
+
+    def get_setpoint(self, osc_num):
+        return np.take(self.theta, osc_num, axis=-1)